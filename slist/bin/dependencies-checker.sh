@@ -54,6 +54,17 @@ check_ver grep       "--version"          "2.20"  'grep \(GNU grep\) ([0-9]+\.[0
 check_ver tput       "-V"                 "5.9"   'ncurses.* ([0-9]+\.[0-9]+)'                    || ok=1
 check_ver curl       "--version"          "7.38"  'curl ([0-9]+\.[0-9]+(\.[0-9]+)?)'              || ok=1
 
+echo
+
+# Python startup cost: every command module must import within the budget
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+if python3 "$SCRIPT_DIR/python" importtime >/dev/null 2>&1; then
+  echo "✓ python     import times within budget"
+else
+  echo "‼ python     import time budget exceeded (run: python3 bin/python importtime)"
+  ok=1
+fi
+
 echo
 if [[ $ok -eq 0 ]]; then
   echo "✅ All required dependencies look good."
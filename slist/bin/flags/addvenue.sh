@@ -4,7 +4,6 @@ set -euo pipefail
 # locate our helpers
 HERE="$(cd "$(dirname "$0")" && pwd)"
 PY_ADD="$HERE/../python/add_venue.py"
-COLOR_UPDATE="$HERE/colorupdate.sh"
 XML_FILE="$(cd "$HERE/../../data" && pwd)/venues.xml"
 
 # run add_venue.py, interactive if no args, or with full+pn if provided
@@ -16,9 +15,6 @@ else
   echo "Usage: $0 [\"Full LN\"] [\"Short PN\"]" >&2
   exit 1
 fi
-
-# now fetch the very last <ln> from venues.xml
-# and update its color tag
-"$COLOR_UPDATE" 
-done
+# add_venue.py writes the new venue's region <color> itself; colorupdate.sh
+# (a full rewrite of venues.xml) is only needed after editing vencolor.json
 
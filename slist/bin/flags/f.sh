@@ -4,6 +4,15 @@ set -euo pipefail
 # Input file (default)
 INPUT="${1:-./../../data/mylist.txt}"
 
+# With region shards (data/shards/) the sorted list is their merge; edits
+# made to mylist.txt since the last merge are synced into the shards first
+DATA_DIR="$(cd "$(dirname "$0")/../../data" && pwd)"
+if [[ $# -eq 0 && -d "$DATA_DIR/shards" ]]; then
+  python3 "$(dirname "$0")/../python/shards.py" --shards "$DATA_DIR/shards" merge --out "$DATA_DIR/mylist.txt"
+  echo "✓ Merged region shards into $DATA_DIR/mylist.txt"
+  exit 0
+fi
+
 # Temp files
 TMP=$(mktemp)
 SORTED=$(mktemp)
@@ -24,6 +24,9 @@ NEEDS_REVIEW="$DATA_DIR/needs_review.txt"
 PY_PARSER="${PY_DIR}/parser.py"      # optional; safe fallback if missing
 PY_SMARTTIME="${PY_DIR}/smarttime.py"
 PY_BANDS="${PY_DIR}/bands_abbrev.py"     # required for abbrev search/expand
+PY_LIVEIDX="${PY_DIR}/live_index.py"     # optional; background live-list dupe index
+PY_SHARDS="${PY_DIR}/shards.py"          # used when data/shards/ exists (region shards)
+SHARDS_DIR="$DATA_DIR/shards"
 
 mkdir -p "$DATA_DIR"
 [[ -f "$VENUES_XML" ]] || { echo "ERROR: Missing $VENUES_XML"; exit 1; }
@@ -40,6 +43,31 @@ declare -A COLORS=(
 )
 strip_ansi() { sed -r 's/\x1B\[[0-9;]*[mK]//g'; }
 
+# ---------------------------
+# Live-list dupe index (coproc, loads in the background)
+# ---------------------------
+start_live_index() {
+  [[ -f "$PY_LIVEIDX" ]] || return 0
+  coproc LIVEIDX { python3 "$PY_LIVEIDX" --data-dir "$DATA_DIR" --venues "$VENUES_XML" serve 2>/dev/null; }
+}
+
+# check_live_dupes "<formatted event>" -> prints a warning if the live list has it
+check_live_dupes() {
+  local event="$1" n line i
+  [[ -n "${LIVEIDX[1]:-}" && -n "${LIVEIDX[0]:-}" ]] || return 0
+  printf '%s\n' "${event//$'\n'/$'\t'}" >&"${LIVEIDX[1]}" 2>/dev/null || return 0
+  IFS= read -r -t 30 -u "${LIVEIDX[0]}" n || return 0
+  if [[ "$n" == "-1" ]]; then
+    echo "(live list unavailable; dupe check skipped)"
+  elif [[ "$n" =~ ^[0-9]+$ ]] && (( n > 0 )); then
+    echo "${COLORS[yellow]}⚠ Likely already on the live list:${COLORS[reset]}"
+    for (( i=0; i<n; i++ )); do
+      IFS= read -r -t 5 -u "${LIVEIDX[0]}" line || break
+      echo "  LIVE: $line"
+    done
+  fi
+}
+
 # ---------------------------
 # Venue prompt (supports both XML shapes)
 #   A) <venue id=".." pn=".." ln=".." color=".."/>
@@ -115,9 +143,9 @@ prompt_venue() {
   if [[ "$save_choice" =~ ^[Yy]$ ]]; then
     read -r -p "Enter short name (default=full): " short_name
     short_name="${short_name:-$selected_venue}"
-    # Call the Python helper
+    # Call the Python helper (it writes the region <color> too, so no
+    # colorupdate.sh pass rewriting all of venues.xml)
     ../python/add_venue.py "$selected_venue" "$short_name"
-    bash ./colorupdate.sh
   fi
   else
         selected_venue=$(xmlstarlet sel \
@@ -341,6 +369,7 @@ confirm_event() {
   echo "Formatted Event:"
   printf "%b\n" "$event_line"
   echo "----------------------"
+  check_live_dupes "$event_line"
   echo ""
 
   local need_review=""
@@ -348,9 +377,14 @@ confirm_event() {
   if [[ "${need_review,,}" == "y" ]]; then
     printf "%b\n" "$event_line" >> "$NEEDS_REVIEW"
     echo "Saved to $(basename "$NEEDS_REVIEW")."
+  elif [[ -d "$SHARDS_DIR" ]] && printf "%b\n" "$event_line" | python3 "$PY_SHARDS" add; then
+    :
   else
     printf "%b\n" "$event_line" >> "$MYLIST"
     echo "Saved to $(basename "$MYLIST")."
+    if [[ -d "$SHARDS_DIR" ]]; then
+      echo "(Could not save to the region shards; the next merge moves it there.)"
+    fi
   fi
 }
 
@@ -372,6 +406,7 @@ prompt_age() {
 # ---------------------------
 # Main loop
 # ---------------------------
+start_live_index
 while true; do
   prompt_venue
   prompt_date
@@ -102,6 +102,24 @@ normalize_flag() {
 if [[ $# -eq 0 ]]; then usage; exit 0; fi
 for tok in "$@"; do case "$tok" in -h|--help|h|help) usage; exit 0 ;; esac; done
 
+# Chains made only of p / s / f / wo run in one Python process (runner.py),
+# sharing the loaded live list, venue index and lists between stages.
+RUNNER_PY="$REPO_ROOT/bin/python/runner.py"
+if [[ -f "$RUNNER_PY" && "${MSM_NO_RUNNER:-}" != "1" ]]; then
+  in_process=1
+  for tok in "$@"; do
+    f="${tok#-}"; f="${f#-}"
+    case "$(normalize_flag "$tok")" in
+      UNKNOWN) ;;
+      *) case "$f" in p|s|f|wo) ;; *) in_process=0 ;; esac ;;
+    esac
+  done
+  if (( in_process )); then
+    export MSM_REPO_ROOT="$REPO_ROOT"
+    exec python3 "$RUNNER_PY" "$@"
+  fi
+fi
+
 # parse argv into a queue of commands (script + its args)
 declare -a CURRENT_ARGS=()
 CURRENT_SCRIPT=""
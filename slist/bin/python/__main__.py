@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+slist — single entry point for the Python side of the show list tools.
+
+  python3 bin/python <command> [args...]      (or bin/slist <command> ...)
+  python3 bin/slist.pyz <command> [args...]   (zipapp build, see below)
+
+Only the module behind the chosen command is imported, and the modules
+themselves import heavy things (requests, xml.etree, readline,
+multiprocessing) inside the functions that use them, so a bash call pays
+only for what it runs. The standalone scripts still work as before.
+
+Build a zipapp next to this directory (data paths resolve the same way):
+  python3 -m zipapp bin/python -o bin/slist.pyz -p "/usr/bin/env python3"
+
+`importtime` checks every command module against IMPORT_BUDGET_MS using
+`python -X importtime`; dependencies-checker.sh runs it, and
+slist/tests/test_importtime.py asserts the same budget under
+`python3 -m unittest discover -s slist/tests`.
+"""
+
+from __future__ import print_function
+import sys, os
+
+# command -> (module, function, help)
+COMMANDS = {
+    'dupes':      ('duplicates', 'main', 'duplicate check of mylist against the live list'),
+    'writeout':   ('write_out', 'main', 'review needs_review.txt, sort, archive'),
+    'future':     ('filter_future_only', 'main', 'drop past-dated listings from a file'),
+    'date':       ('parser', 'main', 'format dates / additional info for g.sh'),
+    'time':       ('smarttime', 'main', 'format a shorthand time'),
+    'bands':      ('bands_abbrev', 'main', 'band abbreviation search/expand/add'),
+    'add-venue':  ('add_venue', 'main', 'add a venue to venues.xml'),
+    'colors':     ('color_update', 'main', 'assign region colors to venues'),
+    'live-index': ('live_index', 'main', 'live-list dupe index (g.sh coproc)'),
+    'live':       ('live_stream', 'main', 'stream/clean the live list'),
+    'venue':      ('venue_resolver', 'main', 'resolve venue text to venue ids'),
+    'history':    ('history', 'main', 'query all archived snapshots'),
+    'table':      ('listing_table', 'main', 'column store over snapshot listings'),
+    'stats':      ('aggregates', 'main', 'incremental venue/band aggregates'),
+    'journal':    ('review_journal', 'main', 'show/prune the review decision journal'),
+    'lint':       ('lint', 'main', 'check list files for malformed listings'),
+    'ledger':     ('ledger', 'main', 'listings already sent in a write-out'),
+    'watch':      ('watch', 'main', 'print new likely dupes as the lists change'),
+    'multiple':   ('multiple_learner', 'main', 'learn <multiple> venue flags from live snapshots'),
+    'replay':     ('replay', 'main', 'record/replay interactive sessions for timing'),
+    'shards':     ('shards', 'main', 'region-sharded mylist: add / merge / sync'),
+    'run':        ('runner', 'main', 'run chained p/s/f/wo flags in one process'),
+}
+
+# Cumulative import time allowed per command module, in milliseconds.
+IMPORT_BUDGET_MS = 60
+
+def usage(out=sys.stdout):
+    out.write("usage: slist <command> [args...]\n\ncommands:\n")
+    for name in sorted(COMMANDS):
+        out.write("  {:<11} {}\n".format(name, COMMANDS[name][2]))
+    out.write("  {:<11} {}\n".format('importtime', 'check module import times against the budget'))
+
+def module_import_ms(module, here):
+    """Cumulative import time of one module (ms), measured in a fresh interpreter."""
+    import subprocess
+    env = dict(os.environ, PYTHONPATH=here)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000.0
+    raise RuntimeError("could not import {}: {}".format(module, proc.stderr.strip()[-200:]))
+
+def importtime(argv):
+    budget = float(argv[0]) if argv else IMPORT_BUDGET_MS
+    here = os.path.dirname(os.path.abspath(__file__))
+    over = 0
+    for name in sorted(COMMANDS):
+        module = COMMANDS[name][0]
+        ms = module_import_ms(module, here)
+        flag = 'ok' if ms <= budget else 'OVER'
+        over += flag == 'OVER'
+        print("{:<4} {:7.1f} ms  {}".format(flag, ms, module))
+    print("budget: {:.0f} ms per module".format(budget))
+    return 1 if over else 0
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help', 'help'):
+        usage()
+        return 0
+    name, rest = sys.argv[1], sys.argv[2:]
+    if name == 'importtime':
+        return importtime(rest)
+    if name not in COMMANDS:
+        sys.stderr.write("slist: unknown command '{}'\n".format(name))
+        usage(sys.stderr)
+        return 2
+    module, func, _ = COMMANDS[name]
+    import importlib
+    mod = importlib.import_module(module)
+    sys.argv = ['slist ' + name] + rest
+    return getattr(mod, func)()
+
+if __name__ == '__main__':
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    sys.exit(main())
@@ -1,53 +1,96 @@
 #!/usr/bin/env python3
-import os, sys
-import xml.etree.ElementTree as ET
+import os, sys, re
+from bisect import bisect_right
 
 # Paths
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
 XML_FILE = os.path.join(BASE, 'venues.xml')
+COLORS_FILE = os.path.join(BASE, 'vencolor.json')
 
-def load_tree():
-    tree = ET.parse(XML_FILE)
-    return tree, tree.getroot()
+# Venue ids are permanent: a new venue gets max(id)+1 and is spliced into the
+# file at its pn-sorted position, so the menu stays alphabetical while the
+# numbers people (and id-keyed caches) know never move.
+# Both shapes g.sh reads: <venue id=".." pn=".." ln=".." color=".."/> and
+# <venue id=".."><pn>..</pn><ln>..</ln>...</venue>
+VENUE_RE = re.compile(r'<venue\b(?P<attrs>[^>]*?)(?:/>|>(?P<body>.*?)</venue>)', re.DOTALL)
+ID_RE = re.compile(r'\bid\s*=\s*["\'](-?\d+)["\']')
+PN_RE = re.compile(r'<pn>(.*?)</pn>', re.DOTALL)
+LN_RE = re.compile(r'<ln>(.*?)</ln>', re.DOTALL)
 
-def save_tree(tree):
-    tree.write(XML_FILE, encoding='utf-8', xml_declaration=True)
+def attr_re(name):
+    return re.compile(r'\b' + name + r'\s*=\s*(["\'])(.*?)\1', re.DOTALL)
 
-def get_entries(root):
-    """Return list of (elem, pn, ln) for all venues except the placeholder."""
+PN_ATTR_RE, LN_ATTR_RE = attr_re('pn'), attr_re('ln')
+
+def _field(body, attrs, child_re, attr_re):
+    m = child_re.search(body or '')
+    if m:
+        return m.group(1)
+    m = attr_re.search(attrs)
+    return m.group(2) if m else ''
+
+def get_entries(text):
+    """Return list of (id, pn, ln, start, end) for every <venue> in the file text."""
+    from xml.sax.saxutils import unescape
     entries = []
-    for v in root.findall('venue'):
-        pid = v.get('id')
-        pn = v.find('pn').text or ''
-        ln = v.find('ln').text or ''
-        if pid != '0':
-            entries.append((v, pn, ln))
+    for m in VENUE_RE.finditer(text):
+        vid = ID_RE.search(m.group('attrs'))
+        if not vid:
+            continue
+        pn = _field(m.group('body'), m.group('attrs'), PN_RE, PN_ATTR_RE)
+        ln = _field(m.group('body'), m.group('attrs'), LN_RE, LN_ATTR_RE)
+        entries.append((int(vid.group(1)),
+                        unescape(pn, {'&quot;': '"', '&apos;': "'"}).strip(),
+                        unescape(ln, {'&quot;': '"', '&apos;': "'"}).strip(),
+                        m.start(), m.end()))
     return entries
 
+def region_color(ln_text, colors_path=None):
+    """The vencolor.json color whose locations match ln, as color_update.py assigns it
+    (exactly one matching color, else None)."""
+    import json
+    colors_path = colors_path or COLORS_FILE
+    if not os.path.exists(colors_path):
+        return None
+    with open(colors_path, 'r', encoding='utf-8') as f:
+        mappings = json.load(f)
+    text = ln_text.strip().lower()
+    hits = set(m['color'] for m in mappings
+               if any(loc.lower() in text for loc in m.get('loc', [])))
+    return hits.pop() if len(hits) == 1 else None
+
+def venue_xml(vid, pn_text, ln_text, color=None):
+    from xml.sax.saxutils import escape
+    return '<venue id="{}">\n    <pn>{}</pn>\n    <ln>{}</ln>\n{}  </venue>'.format(
+        vid, escape(pn_text), escape(ln_text),
+        '    <color>{}</color>\n'.format(escape(color)) if color else '')
+
 def add_venue(ln_text, pn_text):
-    tree, root = load_tree()
-    # Placeholder
-    placeholder = root.find("venue[@id='0']")
-
-    # Build new Element
-    new_v = ET.Element('venue')
-    ET.SubElement(new_v, 'pn').text = pn_text
-    ET.SubElement(new_v, 'ln').text = ln_text
-
-    # Collect and sort by pn
-    entries = get_entries(root) + [(new_v, pn_text, ln_text)]
-    entries.sort(key=lambda x: x[1].lower())
-
-    # Rebuild root
-    root.clear()
-    if placeholder is not None:
-        root.append(placeholder)
-    for idx, (elem, pn, ln) in enumerate(entries, start=1):
-        elem.set('id', str(idx))
-        root.append(elem)
-
-    save_tree(tree)
-    print("Added venue: '{}' (short: '{}')".format(ln_text, pn_text))
+    from bands_abbrev import atomic_write
+    with open(XML_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    entries = get_entries(text)
+
+    new_id = max([vid for vid, _, _, _, _ in entries] + [0]) + 1
+    # the region color goes in with the venue, so no colorupdate pass rewrites the file
+    new_v = venue_xml(new_id, pn_text, ln_text, region_color(ln_text))
+
+    # Insertion point by pn among the real venues (the id 0 placeholder stays first)
+    listed = [e for e in entries if e[0] != 0]
+    pos = bisect_right([e[1].lower() for e in listed], pn_text.lower())
+    if pos < len(listed):
+        at = listed[pos][3]
+        text = text[:at] + new_v + '\n  ' + text[at:]
+    elif entries:
+        at = entries[-1][4]
+        text = text[:at] + '\n  ' + new_v + text[at:]
+    else:
+        at = text.rindex('</venues>')
+        text = text[:at] + '  ' + new_v + '\n' + text[at:]
+
+    atomic_write(XML_FILE, text)
+    print("Added venue: '{}' (short: '{}') as id {}".format(ln_text, pn_text, new_id))
+    return new_id
 
 def main():
     if not os.path.isfile(XML_FILE):
@@ -66,4 +109,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
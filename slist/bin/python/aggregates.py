@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+aggregates.py — incrementally maintained venue/band stats over list history.
+
+`record` diffs one snapshot (a livelist-*.txt or mylist-*.txt) against the
+previous snapshot of the same kind and applies only the difference to the
+materialized counts in data/aggregates.json:
+
+  venue_week   venue -> ISO week -> shows
+  venue_month  venue -> YYYY-MM  -> shows
+  region_band  region (vencolor color) -> band -> shows
+
+A show is keyed by (date, venue, start time) — the same identity
+duplicates.likely_dupe uses — so a listing that is both in mylist and on
+the live list counts once. A show that disappears before its date counts
+as cancelled and is subtracted; one that rolls off after its date stays.
+`report` reads only the aggregates file.
+
+Usage:
+  aggregates.py record --kind live livelist-202610191509.txt
+  aggregates.py rebuild
+  aggregates.py report venues --weeks 8
+  aggregates.py report bands --region green --top 15
+  aggregates.py report trend --venue "el rio"
+"""
+
+from __future__ import print_function
+import sys, os, json, datetime as dt
+
+from duplicates import eprint, parse_plain_list, normalize_venue
+from bands_abbrev import atomic_write
+from history import snapshot_paths, snapshot_date
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+STATE_FILE = 'aggregates.json'
+KINDS = ('live', 'mylist')
+
+def empty_state():
+    return {
+        'version': 1,
+        'sources': {k: {'snapshot': None, 'taken': None, 'shows': []} for k in KINDS},
+        'listings': {},
+        'venue_week': {},
+        'venue_month': {},
+        'region_band': {},
+    }
+
+def load_state(path):
+    if not os.path.exists(path):
+        return empty_state()
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception as ex:
+        eprint("Warning: could not read {} ({}); starting fresh.".format(path, ex))
+        return empty_state()
+
+def save_state(path, state):
+    atomic_write(path, json.dumps(state, sort_keys=True))
+
+def kind_for(path):
+    return 'mylist' if os.path.basename(path).startswith('mylist') else 'live'
+
+# --- snapshot -> shows ---
+def venue_label(rec, resolver):
+    if rec['venue_id'] is not None and resolver is not None:
+        return resolver.venues[rec['venue_id']]['pn']
+    return rec['venue_norm']
+
+def venue_region(rec, resolver):
+    if rec['venue_id'] is not None and resolver is not None:
+        return resolver.venues[rec['venue_id']]['color'] or 'unknown'
+    return 'unknown'
+
+def snapshot_shows(path, resolver, taken_date):
+    """{show_key: [date_key, venue, region, bands]} for one snapshot."""
+    from live_stream import clean_live_text
+    with open(path, 'r') as f:
+        text = clean_live_text(f.read())
+    taken = taken_date.isoformat()
+    shows = {}
+    for rec in parse_plain_list(text, resolver, taken_date):
+        if rec['date_key'] < taken:
+            continue   # stale leftovers; they were counted when they were current
+        venue = venue_label(rec, resolver)
+        key = '{}|{}|{}'.format(rec['date_key'], venue, rec['time_min'])
+        shows[key] = [rec['date_key'], venue, venue_region(rec, resolver), rec['bands']]
+    return shows
+
+# --- applying deltas ---
+def _bump(table, outer, inner, delta):
+    row = table.setdefault(outer, {})
+    n = row.get(inner, 0) + delta
+    if n > 0:
+        row[inner] = n
+    else:
+        row.pop(inner, None)
+        if not row:
+            table.pop(outer, None)
+
+def apply_show(state, info, delta):
+    date_key, venue, region, bands = info
+    d = dt.date(*map(int, date_key.split('-')))
+    iso = d.isocalendar()
+    _bump(state['venue_week'], venue, '{:04d}-W{:02d}'.format(iso[0], iso[1]), delta)
+    _bump(state['venue_month'], venue, date_key[:7], delta)
+    for band in bands:
+        _bump(state['region_band'], region, band, delta)
+
+def record_snapshot(state, path, resolver, kind=None):
+    """Apply one snapshot's delta. Returns (added, cancelled) counts."""
+    kind = kind or kind_for(path)
+    src = state['sources'][kind]
+    taken_date = snapshot_date(path)
+    taken = taken_date.isoformat()
+    if src['taken'] and taken < src['taken']:
+        eprint("Skipping {}: older than the last recorded {} snapshot.".format(
+            os.path.basename(path), kind))
+        return 0, 0
+    if src['snapshot'] == os.path.basename(path):
+        return 0, 0
+
+    listings = state['listings']
+    new = snapshot_shows(path, resolver, taken_date)
+    prev = set(src['shows'])
+    added = cancelled = 0
+
+    for key in set(new) - prev:
+        entry = listings.get(key)
+        if entry is None:
+            listings[key] = {'info': new[key], 'refs': [kind]}
+            apply_show(state, new[key], +1)
+            added += 1
+        elif kind not in entry['refs']:
+            entry['refs'].append(kind)
+
+    for key in prev - set(new):
+        entry = listings.get(key)
+        if entry is None:
+            continue
+        if kind in entry['refs']:
+            entry['refs'].remove(kind)
+        if entry['refs']:
+            continue
+        if entry['info'][0] >= taken:
+            apply_show(state, entry['info'], -1)   # gone before its date: cancelled
+            cancelled += 1
+        del listings[key]   # past shows stay counted but leave the working set
+
+    src['snapshot'] = os.path.basename(path)
+    src['taken'] = taken
+    src['shows'] = sorted(new)
+    return added, cancelled
+
+def _resolver(args):
+    from venue_resolver import load_resolver
+    return load_resolver(args.venues)
+
+def state_path(args):
+    return os.path.join(args.data_dir, STATE_FILE)
+
+def cmd_record(args):
+    path = state_path(args)
+    state = load_state(path)
+    resolver = _resolver(args)
+    for snap in args.snapshots:
+        added, cancelled = record_snapshot(state, snap, resolver, args.kind)
+        eprint("{}: +{} new, -{} cancelled".format(os.path.basename(snap), added, cancelled))
+    save_state(path, state)
+    return 0
+
+def cmd_rebuild(args):
+    state = empty_state()
+    resolver = _resolver(args)
+    snaps = sorted(snapshot_paths(args.data_dir), key=lambda p: (snapshot_date(p), p))
+    for snap in snaps:
+        record_snapshot(state, snap, resolver)
+    save_state(state_path(args), state)
+    eprint("Rebuilt aggregates from {} snapshots.".format(len(snaps)))
+    return 0
+
+# --- reports (aggregates only) ---
+def recent_weeks(n, today=None):
+    today = today or dt.date.today()
+    out = []
+    for i in range(n):
+        iso = (today - dt.timedelta(weeks=i)).isocalendar()
+        out.append('{:04d}-W{:02d}'.format(iso[0], iso[1]))
+    return out
+
+def report_venues(state, args):
+    weeks = recent_weeks(args.weeks)
+    rows = []
+    for venue, per_week in state['venue_week'].items():
+        total = sum(per_week.get(w, 0) for w in weeks)
+        if total:
+            rows.append((total / float(len(weeks)), venue))
+    rows.sort(reverse=True)
+    print("Shows/week over the last {} weeks:".format(len(weeks)))
+    for avg, venue in rows[:args.top]:
+        print("  {:6.2f}  {}".format(avg, venue))
+
+def report_bands(state, args):
+    regions = [args.region] if args.region else sorted(state['region_band'])
+    for region in regions:
+        counts = state['region_band'].get(region, {})
+        top = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:args.top]
+        print("{}:".format(region))
+        for band, n in top:
+            print("  {:5d}  {}".format(n, band))
+
+def report_trend(state, args):
+    want = normalize_venue(args.venue) if args.venue else None
+    for venue in sorted(state['venue_month']):
+        if want and want not in normalize_venue(venue):
+            continue
+        months = state['venue_month'][venue]
+        print("{}:".format(venue))
+        for month in sorted(months):
+            print("  {}  {:4d}  {}".format(month, months[month], '#' * min(months[month], 60)))
+
+def cmd_report(args):
+    state = load_state(state_path(args))
+    {'venues': report_venues, 'bands': report_bands, 'trend': report_trend}[args.what](state, args)
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='aggregates.py')
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    sub = ap.add_subparsers(dest='cmd')
+
+    r = sub.add_parser('record', help='apply new snapshot(s) to the aggregates')
+    r.add_argument('snapshots', nargs='+')
+    r.add_argument('--kind', choices=KINDS, help='default: from the file name')
+    r.set_defaults(func=cmd_record)
+
+    b = sub.add_parser('rebuild', help='recompute from every snapshot in the data dir')
+    b.set_defaults(func=cmd_rebuild)
+
+    p = sub.add_parser('report', help='print stats from the aggregates')
+    p.add_argument('what', choices=('venues', 'bands', 'trend'))
+    p.add_argument('--weeks', type=int, default=8)
+    p.add_argument('--region', help='vencolor region (green, blue, red, ...)')
+    p.add_argument('--venue', help='venue name filter for trend')
+    p.add_argument('--top', type=int, default=20)
+    p.set_defaults(func=cmd_report)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,8 +3,7 @@
 # Python 3.5+ compatible (no f-strings)
 
 from __future__ import print_function
-import sys, os, json, tempfile, shutil
-from argparse import ArgumentParser
+import sys, os, json
 
 def load_db(path):
     if not os.path.exists(path):
@@ -18,12 +17,24 @@ def load_db(path):
     except Exception:
         return {"abbr_map": {}, "names_seen": []}
 
+def keep_mode(path, tmp):
+    """Give tmp the mode of the file it replaces (mkstemp makes 0600), or a new file's default."""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(tmp, mode)
+
 def atomic_write(path, text):
+    import tempfile
     d = os.path.dirname(path) or "."
     fd, tmp = tempfile.mkstemp(prefix=".tmp_bands_", dir=d)
     try:
         with os.fdopen(fd, "w") as f:
             f.write(text)
+        keep_mode(path, tmp)
         os.replace(tmp, path)
     except Exception:
         try: os.remove(tmp)
@@ -130,6 +141,7 @@ def cmd_add(args):
     return 0
 
 def build_parser():
+    from argparse import ArgumentParser
     p = ArgumentParser(prog="bands_abbrev.py")
     p.add_argument("--db", default=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "bands.json"))
     sub = p.add_subparsers(dest="cmd")
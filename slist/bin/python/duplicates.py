@@ -2,18 +2,14 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import print_function
-import argparse, sys, re, os, tempfile, datetime as dt
-
-try:
-    import requests
-except Exception:
-    requests = None
+import sys, re, os, datetime as dt
 
 MONTHS = ['jan','feb','mar','apr','may','jun','jul','aug','sep','oct','nov','dec']
 DATE_HEADER_RE = re.compile(
     r'^(?P<mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s{1,2}(?P<day>\d{1,2})\s+(?P<dow>sun|mon|tue|wed|thr|fri|sat)\b',
     re.IGNORECASE)
 TIME_TOKEN_RE = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*([ap])m', re.IGNORECASE)
+BAND_SPLIT_RE = re.compile(r'\s*(?:,|\s\+\s|\s/\s)\s*')
 
 def eprint(msg):
     sys.stderr.write(str(msg) + "\n")
@@ -47,8 +43,8 @@ def extract_first_time_minutes(text):
     ap = m.group(3)
     return hhmm_to_minutes(h, mm, ap)
 
-def year_for_next_occurrence(mon, day):
-    today = dt.date.today()
+def year_for_next_occurrence(mon, day, today=None):
+    today = today or dt.date.today()
     try:
         candidate = dt.date(today.year, mon, day)
     except Exception:
@@ -73,7 +69,13 @@ def parse_blocks_from_text(lines):
     if current: blocks.append(current)
     return blocks
 
-def parse_block(block_lines):
+def venue_key(rec):
+    """Key used to compare venues: the venues.xml id when resolved, else the normalized text."""
+    if rec.get('venue_id') is not None:
+        return ('id', rec['venue_id'])
+    return ('norm', rec['venue_norm'])
+
+def parse_block(block_lines, resolver=None, today=None):
     first = ''
     for l in block_lines:
         if l.strip():
@@ -83,37 +85,123 @@ def parse_block(block_lines):
     mon_txt = m.group('mon').lower()
     day = int(m.group('day'))
     mon = MONTHS.index(mon_txt) + 1
-    year = year_for_next_occurrence(mon, day)
+    year = year_for_next_occurrence(mon, day, today)
     date_key = "{:04d}-{:02d}-{:02d}".format(year, mon, day)
 
     block_text = normalize_text(' '.join(l.strip() for l in block_lines if l is not None))
     at_pos = block_text.rfind(' at ')
     venue_norm = None
+    venue_id = None
     if at_pos != -1:
         rhs = block_text[at_pos+4:]
         cut = re.search(r'\b(?:a/a|18\+|21\+|[0-9]{1,2}(?::[0-9]{2})?\s*[ap]m|\$\d|free|donation|sliding scale)\b', rhs)
         venue_raw = rhs if not cut else rhs[:cut.start()]
         venue_norm = normalize_venue(venue_raw)
+        if resolver is not None:
+            venue_id = resolver.resolve(rhs)
+
+    head = DATE_HEADER_RE.match(block_text)
+    lineup = block_text[head.end() if head else 0:at_pos if at_pos != -1 else len(block_text)]
+    bands = [b for b in BAND_SPLIT_RE.split(lineup.strip()) if b]
 
     time_min = extract_first_time_minutes(block_text)
     return {
         'date_key': date_key,
         'venue_norm': venue_norm,
+        'venue_id': venue_id,
         'time_min': time_min,
+        'bands': bands,
         'full_text': '\n'.join(block_lines).strip()
     }
 
-def parse_plain_list(text):
+def listing_hash(rec):
+    """Stable id for a listing: its date plus whitespace/case-normalized text."""
+    import hashlib
+    key = rec['date_key'] + '|' + normalize_text(rec['full_text'])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def parse_plain_list(text, resolver=None, today=None):
     lines = text.splitlines()
     blocks = parse_blocks_from_text(lines)
     out = []
     for b in blocks:
-        rec = parse_block(b)
+        rec = parse_block(b, resolver, today)
         if rec and rec['venue_norm']:
             out.append(rec)
     return out
 
-def parse_mylist(text):
+class LazyLiveList(object):
+    """A live list indexed by date header only; blocks are parsed per date on first use.
+
+    The first pass just finds date headers and records each block's line
+    range under its date_key. bucket(date_key) runs parse_block over that
+    date's blocks once and memoizes the result, so a dupe check touches
+    only the dates that appear in the local list.
+    """
+
+    def __init__(self, text, resolver=None, today=None):
+        self.resolver = resolver
+        self.today = today
+        self.lines = text.splitlines()
+        self.ranges = {}    # date_key -> [(start, end), ...]
+        self.parsed = {}    # date_key -> {venue_key: [rec, ...]}
+        years = {}
+        start = key = None
+        for i, line in enumerate(self.lines):
+            m = DATE_HEADER_RE.match(line.strip().lower())
+            if not m:
+                continue
+            if key is not None:
+                self.ranges[key].append((start, i))
+            md = (m.group('mon'), int(m.group('day')))
+            key = years.get(md)
+            if key is None:
+                mon = MONTHS.index(md[0]) + 1
+                key = years[md] = "{:04d}-{:02d}-{:02d}".format(
+                    year_for_next_occurrence(mon, md[1], today), mon, md[1])
+            self.ranges.setdefault(key, [])
+            start = i
+        if key is not None:
+            self.ranges[key].append((start, len(self.lines)))
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Wrap already-parsed entries (e.g. a stream-parsed live list)."""
+        live = cls('')
+        for e in entries:
+            live.ranges.setdefault(e['date_key'], [])
+            live.parsed.setdefault(e['date_key'], {}).setdefault(venue_key(e), []).append(e)
+        return live
+
+    def __len__(self):
+        if not self.lines:
+            return sum(len(recs) for b in self.parsed.values() for recs in b.values())
+        return sum(len(r) for r in self.ranges.values())
+
+    def dates(self):
+        return sorted(self.ranges)
+
+    def bucket(self, date_key):
+        """{venue_key: [rec, ...]} for one date, parsed on first request."""
+        out = self.parsed.get(date_key)
+        if out is None:
+            out = self.parsed[date_key] = {}
+            for start, end in self.ranges.get(date_key, ()):
+                rec = parse_block(self.lines[start:end], self.resolver, self.today)
+                if rec and rec['venue_norm']:
+                    out.setdefault(venue_key(rec), []).append(rec)
+        return out
+
+    def candidates(self, date_key, vkey):
+        return self.bucket(date_key).get(vkey, [])
+
+    def __iter__(self):
+        for date_key in self.dates():
+            for recs in self.bucket(date_key).values():
+                for rec in recs:
+                    yield rec
+
+def parse_mylist(text, resolver=None):
     lines = [l.rstrip('\n') for l in text.splitlines()]
     entries, i = [], 0
     while i < len(lines):
@@ -122,7 +210,7 @@ def parse_mylist(text):
             block = [lines[i]]
             if i+1 < len(lines) and lines[i+1].strip() != '':
                 block.append(lines[i+1])
-            rec = parse_block(block)
+            rec = parse_block(block, resolver)
             if rec and rec['venue_norm']:
                 entries.append(rec)
             i += 2
@@ -130,6 +218,24 @@ def parse_mylist(text):
             i += 1
     return entries
 
+def unparsed_blocks(text, entries):
+    """Blocks of a mylist text that parse_mylist did not turn into entries."""
+    parsed = set(e['full_text'] for e in entries)
+    lines = [l.rstrip('\n') for l in text.splitlines()]
+    out, i = [], 0
+    while i < len(lines):
+        if not lines[i].strip():
+            i += 1
+        elif DATE_HEADER_RE.match(lines[i].strip().lower()):
+            block = lines[i:i+2] if i+1 < len(lines) and lines[i+1].strip() != '' else lines[i:i+1]
+            if '\n'.join(block).strip() not in parsed:
+                out.append('\n'.join(block))
+            i += 2
+        else:
+            out.append(lines[i])
+            i += 1
+    return out
+
 def load_venues_dict(path):
     d = {}
     if not path or not os.path.exists(path): return d
@@ -138,17 +244,22 @@ def load_venues_dict(path):
         tree = ET.parse(path)
         root = tree.getroot()
         for v in root.findall('venue'):
-            ln = (v.findtext('ln') or '').strip()
-            pn = (v.findtext('pn') or '').strip()
+            ln = (v.findtext('ln') or v.get('ln') or '').strip()
+            pn = (v.findtext('pn') or v.get('pn') or '').strip()
             norm_any = normalize_venue(ln or pn)
             multiple = (v.findtext('multiple') or '').strip().lower() in ('true','1','yes','y')
-            d[norm_any] = multiple
+            d[('norm', norm_any)] = multiple
+            try:
+                d[('id', int(v.get('id')))] = multiple
+            except (TypeError, ValueError):
+                pass
         return d
     except Exception as ex:
         eprint("Warning: could not parse venues.xml: " + str(ex))
         return {}
 
-def save_venues_multiple_true(path, venue_norm):
+def save_venues_multiple_true(path, key):
+    """Set <multiple>true</multiple> on the venue matching a venue_key()."""
     if not path or not os.path.exists(path): return False
     try:
         import xml.etree.ElementTree as ET
@@ -156,10 +267,10 @@ def save_venues_multiple_true(path, venue_norm):
         root = tree.getroot()
         changed = False
         for v in root.findall('venue'):
-            ln = (v.findtext('ln') or '').strip()
-            pn = (v.findtext('pn') or '').strip()
+            ln = (v.findtext('ln') or v.get('ln') or '').strip()
+            pn = (v.findtext('pn') or v.get('pn') or '').strip()
             norm_any = normalize_venue(ln or pn)
-            if norm_any == venue_norm:
+            if key in (('norm', norm_any), ('id', int(v.get('id') or -1))):
                 el = v.find('multiple')
                 if el is None:
                     el = ET.SubElement(v, 'multiple')
@@ -175,15 +286,20 @@ def save_venues_multiple_true(path, venue_norm):
         return False
 
 def load_live_list(args):
+    from live_stream import clean_live_text
     if args.live_cache:
-        return open(args.live_cache, 'r').read()
+        return clean_live_text(open(args.live_cache, 'r').read())
     elif args.live_url:
+        try:
+            import requests
+        except Exception:
+            requests = None
         if not requests:
             eprint("requests not available; install or use --live-cache"); sys.exit(1)
         try:
             r = requests.get(args.live_url, timeout=20)
             r.raise_for_status()
-            return r.text
+            return clean_live_text(r.text)
         except Exception as ex:
             eprint("Error fetching live URL: " + str(ex)); sys.exit(1)
     else:
@@ -191,7 +307,7 @@ def load_live_list(args):
 
 def likely_dupe(a, b):
     if a['date_key'] != b['date_key']: return False
-    if a['venue_norm'] != b['venue_norm']: return False
+    if venue_key(a) != venue_key(b): return False
     ta, tb = a['time_min'], b['time_min']
     if ta is None or tb is None: return True
     return abs(ta - tb) <= 60
@@ -205,15 +321,124 @@ def get_tty_streams():
     except Exception:
         return None, None
 
-def interactive_filter(my_entries, live_entries, venues_map, venues_path, non_interactive):
-    live_by_key = {}
-    for e in live_entries:
-        key = (e['date_key'], e['venue_norm'])
-        live_by_key.setdefault(key, []).append(e)
+# --- dupe clusters and auto-resolution rules ---
+RULES_FILE = 'dupe_rules.json'
+DEFAULT_RULES = {
+    # omit without asking when the best live candidate scores at least this
+    # (null = off; opt in with e.g. 0.9 in dupe_rules.json)
+    'auto_omit_score': None,
+    # keep without asking when the best live candidate scores below this (null = off)
+    'auto_keep_score': None,
+    # <multiple> venues: "disjoint" keeps a listing whose lineup shares no band
+    # with any candidate and reviews the rest; "keep" never checks them
+    'multiple_venues': 'disjoint',
+}
+
+def load_rules(path):
+    """DEFAULT_RULES overlaid with the JSON object in path (if it exists)."""
+    rules = dict(DEFAULT_RULES)
+    if path and os.path.exists(path):
+        import json
+        try:
+            with open(path, 'r') as f:
+                rules.update(json.load(f))
+        except Exception as ex:
+            eprint("Warning: could not read {} ({}); using default rules.".format(path, ex))
+    return rules
+
+def dupe_score(a, b):
+    """0..1 likeness of two listings already at the same date and venue."""
+    if normalize_text(a['full_text']) == normalize_text(b['full_text']):
+        return 1.0
+    ba, bb = set(a['bands']), set(b['bands'])
+    lineup = len(ba & bb) / float(len(ba | bb)) if (ba or bb) else 0.0
+    ta, tb = a['time_min'], b['time_min']
+    timing = 0.5 if ta is None or tb is None else 1.0 - min(abs(ta - tb), 60) / 60.0
+    return round(0.2 + 0.5 * lineup + 0.3 * timing, 2)
+
+def build_cluster(e, candidates):
+    """Local entry + every likely-dupe live candidate, best first."""
+    dupes = sorted(((dupe_score(e, x), x) for x in candidates if likely_dupe(e, x)),
+                   key=lambda sx: -sx[0])
+    if not dupes:
+        return None
+    return {'entry': e, 'candidates': [x for _, x in dupes], 'scores': [s for s, _ in dupes],
+            'score': dupes[0][0]}
+
+def auto_resolve(cluster, is_mult, rules):
+    """('y'|'n', reason) when a rule settles the cluster, else None."""
+    if is_mult:
+        lineup = set(cluster['entry']['bands'])
+        if not any(lineup & set(x['bands']) for x in cluster['candidates']):
+            return 'n', 'multiple-shows venue, different lineup'
+    if rules.get('auto_omit_score') is not None and cluster['score'] >= rules['auto_omit_score']:
+        return 'y', 'score >= {}'.format(rules['auto_omit_score'])
+    if rules.get('auto_keep_score') is not None and cluster['score'] < rules['auto_keep_score']:
+        return 'n', 'score < {}'.format(rules['auto_keep_score'])
+    return None
+
+def interactive_filter(my_entries, live_entries, venues_map, venues_path, non_interactive,
+                       journal=None, progress=None, rules=None):
+    rules = rules if rules is not None else DEFAULT_RULES
+    live = live_entries if isinstance(live_entries, LazyLiveList) else LazyLiveList.from_entries(live_entries)
+
+    # progress (if given) lets the caller save accepted + unreviewed entries on Ctrl-C;
+    # entries[:done] are settled and the kept ones are in out
+    if progress is None:
+        progress = {'out': [], 'done': 0}
+    out_blocks = progress['out']
+    total = len(my_entries)
+    decided = {}   # index -> kept text, or None when omitted
+
+    def settle(idx, text):
+        decided[idx] = text
+        while progress['done'] < total and progress['done'] in decided:
+            kept = decided[progress['done']]
+            if kept is not None:
+                out_blocks.append(kept)
+            progress['done'] += 1
+
+    # 1) Cluster every entry with all of its live candidates; settle what we can
+    pending = []   # (idx, cluster, listing_id, live_id)
+    replayed = 0
+    auto = {}
+    for idx, e in enumerate(my_entries):
+        sys.stderr.write("Checking {}/{}…\r".format(idx + 1, total))
+        sys.stderr.flush()
+        is_mult = venues_map.get(venue_key(e), False)
+        cluster = None
+        if not (is_mult and rules.get('multiple_venues') == 'keep'):
+            cluster = build_cluster(e, live.candidates(e['date_key'], venue_key(e)))
+        if cluster is None:
+            settle(idx, e['full_text'])
+            continue
+
+        listing_id = listing_hash(e)
+        live_id = ','.join(sorted(listing_hash(x) for x in cluster['candidates']))
+        past = journal.get('dupes', listing_id, live_id) if journal else None
+        if past is not None:
+            # Same listing vs. same live match as before: reuse that decision
+            replayed += 1
+            if past['choice'] in ('e', 'u') and past.get('text'):
+                e['full_text'] = past['text']
+            settle(idx, None if past['choice'] == 'y' else e['full_text'])
+            continue
+
+        rule = auto_resolve(cluster, is_mult, rules)
+        if rule is not None:
+            auto[rule[1]] = auto.get(rule[1], 0) + 1
+            settle(idx, None if rule[0] == 'y' else e['full_text'])
+            continue
+        pending.append((idx, cluster, listing_id, live_id))
+    sys.stderr.write("\n"); sys.stderr.flush()
+    for reason, n in sorted(auto.items()):
+        eprint("Auto-resolved {} cluster(s): {}.".format(n, reason))
+    if replayed:
+        eprint("Reused {} earlier decision(s) from the review journal.".format(replayed))
 
     # Prepare TTY for prompts even when stdout is redirected
     tty_in, tty_out = (None, None)
-    if not non_interactive:
+    if pending and not non_interactive:
         if sys.stdout.isatty():
             tty_in, tty_out = sys.stdin, sys.stdout
         else:
@@ -222,50 +447,69 @@ def interactive_filter(my_entries, live_entries, venues_map, venues_path, non_in
                 eprint("No TTY available; running non-interactive.")
                 non_interactive = True
 
-    out_blocks = []
-    total = len(my_entries)
-    for idx, e in enumerate(my_entries, 1):
-        sys.stderr.write("Checking {}/{}…\r".format(idx, total))
-        sys.stderr.flush()
-
-        key = (e['date_key'], e['venue_norm'])
-        candidates = live_by_key.get(key, [])
-        is_mult = venues_map.get(e['venue_norm'], False)
-
-        dupes = [x for x in candidates if likely_dupe(e, x)]
-        if dupes and not is_mult and not non_interactive:
-            # Prompt on TTY
-            tty_out.write("\nPossible duplicate found:\n")
-            tty_out.write("  YOUR: " + e['full_text'] + "\n")
-            tty_out.write("  LIVE: " + dupes[0]['full_text'] + "\n")
-            tty_out.write("Duplicate? [y=omit / n=keep / e=edit / u=update-note / m=mark-venue-multiple] > ")
-            tty_out.flush()
-            choice = (tty_in.readline().strip().lower() or 'n')
-
-            if choice == 'y':
-                continue
-            elif choice == 'm' and venues_path:
-                if save_venues_multiple_true(venues_path, e['venue_norm']):
-                    venues_map[e['venue_norm']] = True
-                    tty_out.write("  Marked venue as multiple; keeping this listing.\n")
-                    tty_out.flush()
-            elif choice == 'e':
-                tty_out.write("Edit your listing, then press Enter (blank = keep as-is):\n")
-                tty_out.write(e['full_text'] + "\n")
+    def record(item, choice, text=None):
+        idx, cluster, listing_id, live_id = item
+        if journal:
+            journal.record('dupes', listing_id, choice, live_id, text)
+        settle(idx, None if choice == 'y' else cluster['entry']['full_text'])
+
+    # 2) Ambiguous clusters: show them together, then bulk or one-by-one review
+    if pending and non_interactive:
+        for idx, cluster, _, _ in pending:
+            settle(idx, cluster['entry']['full_text'])
+        pending = []
+    if pending:
+        tty_out.write("\n{} possible duplicate(s) need a decision:\n".format(len(pending)))
+        for n, (_, cluster, _, _) in enumerate(pending, 1):
+            tty_out.write("\n[{}] YOUR: {}\n".format(n, cluster['entry']['full_text']))
+            for score, x in zip(cluster['scores'], cluster['candidates']):
+                tty_out.write("    LIVE ({:.2f}): {}\n".format(score, x['full_text']))
+        tty_out.write("\nBulk: [Enter]=one by one / k=keep all / y=omit all / "
+                      "numbers to omit, rest kept (e.g. 1 3) > ")
+        tty_out.flush()
+        bulk = tty_in.readline().strip().lower()
+        if bulk in ('k', 'y'):
+            for item in pending:
+                record(item, 'n' if bulk == 'k' else 'y')
+            pending = []
+        elif bulk and all(tok.isdigit() for tok in bulk.split()):
+            omit = set(int(tok) for tok in bulk.split())
+            for n, item in enumerate(pending, 1):
+                record(item, 'y' if n in omit else 'n')
+            pending = []
+
+    for item in pending:
+        _, cluster, _, _ = item
+        e = cluster['entry']
+        # Prompt on TTY
+        tty_out.write("\nPossible duplicate found:\n")
+        tty_out.write("  YOUR: " + e['full_text'] + "\n")
+        for x in cluster['candidates']:
+            tty_out.write("  LIVE: " + x['full_text'] + "\n")
+        tty_out.write("Duplicate? [y=omit / n=keep / e=edit / u=update-note / m=mark-venue-multiple] > ")
+        tty_out.flush()
+        choice = (tty_in.readline().strip().lower() or 'n')
+
+        if choice == 'm' and venues_path:
+            if save_venues_multiple_true(venues_path, venue_key(e)):
+                venues_map[venue_key(e)] = True
+                tty_out.write("  Marked venue as multiple; keeping this listing.\n")
                 tty_out.flush()
-                edited = tty_in.readline().rstrip('\n')
-                if edited.strip():
-                    e['full_text'] = edited
-            elif choice == 'u':
-                tty_out.write("Type an update note (e.g. lineup/time/venue change), then Enter (blank = skip):\n")
-                tty_out.flush()
-                note = tty_in.readline().strip()
-                if note:
-                    e['full_text'] = e['full_text'] + "  " + note
-
-        out_blocks.append(e['full_text'])
+        elif choice == 'e':
+            tty_out.write("Edit your listing, then press Enter (blank = keep as-is):\n")
+            tty_out.write(e['full_text'] + "\n")
+            tty_out.flush()
+            edited = tty_in.readline().rstrip('\n')
+            if edited.strip():
+                e['full_text'] = edited
+        elif choice == 'u':
+            tty_out.write("Type an update note (e.g. lineup/time/venue change), then Enter (blank = skip):\n")
+            tty_out.flush()
+            note = tty_in.readline().strip()
+            if note:
+                e['full_text'] = e['full_text'] + "  " + note
+        record(item, choice, e['full_text'] if choice in ('e', 'u') else None)
 
-    sys.stderr.write("\n"); sys.stderr.flush()
     # Close /dev/tty if we opened it
     if tty_in not in (None, sys.stdin):
         try: tty_in.close()
@@ -275,7 +519,29 @@ def interactive_filter(my_entries, live_entries, venues_map, venues_path, non_in
         except Exception: pass
     return out_blocks
 
+def save_partial(blocks, journal=None):
+    """After a Ctrl-C: write the accepted plus not-yet-reviewed blocks to a temp file."""
+    import tempfile
+    tb = tempfile.NamedTemporaryFile(delete=False, prefix="mylist_partial_", suffix=".txt")
+    path = tb.name; tb.close()
+    eprint("\nInterrupted. Writing accepted items plus the ones not reviewed yet to: {}".format(path))
+    if journal:
+        eprint("Decisions so far are in {}; rerun to pick up where you left off.".format(journal.path))
+    try:
+        with open(path, 'a') as wf:
+            for b in blocks:
+                lines = b.splitlines()
+                if len(lines) >= 2:
+                    wf.write(lines[0] + "\n")
+                    wf.write(lines[1] + "\n")
+                else:
+                    wf.write(b + "\n")
+    except Exception as ex:
+        eprint("Could not write partial file: " + str(ex))
+    return path
+
 def main():
+    import argparse
     ap = argparse.ArgumentParser()
     ap.add_argument('--mylist', required=True)
     g = ap.add_mutually_exclusive_group(required=True)
@@ -283,26 +549,47 @@ def main():
     g.add_argument('--live-url')
     ap.add_argument('--venues', help='venues.xml (optional, for marking multiple)')
     ap.add_argument('--non-interactive', action='store_true',
-                    help='do not prompt; keep all (still honors <multiple>)')
+                    help='do not prompt; keep every dupe the rules do not settle')
+    ap.add_argument('--journal', help='review journal (default: review_journal.jsonl next to --mylist)')
+    ap.add_argument('--no-journal', action='store_true', help='do not record or replay decisions')
+    ap.add_argument('--rules', help='auto-resolution rules JSON (default: dupe_rules.json next to --mylist)')
     args = ap.parse_args()
+    rules = load_rules(args.rules or os.path.join(
+        os.path.dirname(os.path.abspath(args.mylist)), RULES_FILE))
+
+    journal = None
+    if not args.no_journal:
+        from review_journal import Journal, JOURNAL_FILE
+        journal = Journal(args.journal or os.path.join(
+            os.path.dirname(os.path.abspath(args.mylist)), JOURNAL_FILE))
+    my_entries = []
+    passthrough = []   # unparseable blocks, emitted unchanged
+    progress = {'out': [], 'done': 0}
 
     try:
-        eprint("Parsing live list…")
-        live_text = load_live_list(args)
-        live_entries = parse_plain_list(live_text)
-        eprint("Parsed {} live entries.".format(len(live_entries)))
+        resolver = None
+        if args.venues:
+            from venue_resolver import load_resolver
+            resolver = load_resolver(args.venues)
+
+        eprint("Indexing live list…")
+        live_entries = LazyLiveList(load_live_list(args), resolver)
+        eprint("Indexed {} live listings over {} dates.".format(
+            len(live_entries), len(live_entries.dates())))
 
         eprint("Parsing mylist…")
         my_text = open(args.mylist, 'r').read()
-        my_entries = parse_mylist(my_text)
+        my_entries = parse_mylist(my_text, resolver)
         eprint("Parsed {} local entries.".format(len(my_entries)))
+        passthrough = unparsed_blocks(my_text, my_entries)
 
         venues_map = load_venues_dict(args.venues) if args.venues else {}
 
-        filtered_blocks = interactive_filter(my_entries, live_entries, venues_map, args.venues, args.non_interactive)
+        filtered_blocks = interactive_filter(my_entries, live_entries, venues_map, args.venues,
+                                             args.non_interactive, journal, progress, rules)
 
         # Emit final list to stdout (which may be redirected by caller)
-        for b in filtered_blocks:
+        for b in passthrough + filtered_blocks:
             lines = b.splitlines()
             if len(lines) >= 2:
                 print(lines[0])
@@ -316,20 +603,8 @@ def main():
                     print(b)
 
     except KeyboardInterrupt:
-        tb = tempfile.NamedTemporaryFile(delete=False, prefix="mylist_partial_", suffix=".txt")
-        path = tb.name; tb.close()
-        eprint("\nInterrupted. Writing any accepted items so far to: {}".format(path))
-        try:
-            for e in my_entries:
-                lines = e['full_text'].splitlines()
-                with open(path, 'a') as wf:
-                    if len(lines) >= 2:
-                        wf.write(lines[0] + "\n")
-                        wf.write(lines[1] + "\n")
-                    else:
-                        wf.write(e['full_text'] + "\n")
-        except Exception as ex:
-            eprint("Could not write partial file: " + str(ex))
+        save_partial(passthrough + progress['out'] + [e['full_text'] for e in my_entries[progress['done']:]],
+                     journal)
         sys.exit(130)
 
 if __name__ == '__main__':
@@ -70,20 +70,8 @@ def intended_date(m, d, listed_dow, today):
             intended = dt_this  # None if invalid; handled upstream
     return intended
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: filter_future_only.py needs_review.txt", file=sys.stderr)
-        sys.exit(2)
-
-    path = sys.argv[1]
-    try:
-        with open(path, 'r') as f:
-            lines = [ln.rstrip('\n') for ln in f]
-    except Exception as e:
-        print("Error reading file:", e, file=sys.stderr)
-        sys.exit(1)
-
-    # Group into strict two-line blocks, ignoring blank lines
+def group_blocks(lines):
+    """Group into strict two-line blocks, ignoring blank lines."""
     blocks = []
     buf = []
     for ln in lines:
@@ -96,9 +84,10 @@ def main():
     # If odd line leftover, keep it as a one-line block (we'll pass it through)
     if buf:
         blocks.append(tuple(buf))
+    return blocks
 
-    today = date.today()
-
+def future_blocks(blocks, today):
+    """Drop blocks dated before today; unparseable blocks are kept."""
     kept = []
     for blk in blocks:
         head = blk[0]
@@ -117,6 +106,23 @@ def main():
             print("Dropping past listing:", head, file=sys.stderr)
             continue
         kept.append(blk)
+    return kept
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: filter_future_only.py needs_review.txt", file=sys.stderr)
+        sys.exit(2)
+
+    path = sys.argv[1]
+    try:
+        with open(path, 'r') as f:
+            lines = [ln.rstrip('\n') for ln in f]
+    except Exception as e:
+        print("Error reading file:", e, file=sys.stderr)
+        sys.exit(1)
+
+    blocks = group_blocks(lines)
+    kept = future_blocks(blocks, date.today())
 
     # Emit kept blocks (preserve your exact formatting: line1, newline, line2, newline)
     out = []
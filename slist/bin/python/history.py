@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+history.py — query every archived snapshot at once.
+
+Each mylist-*.txt / livelist-*.txt in the data dir is memory-mapped and
+scanned by a process pool for date headers (a snapshot saved as an HTML
+page is run through live_stream's cleaner first, as the live list is);
+only blocks that pass a cheap byte-level prefilter are decoded and run
+through parse_block, and the venue is confirmed on the parsed record
+(by id when --venue resolves, else by normalized name). Years are
+inferred relative to the snapshot's own date (from its file name), so
+old archives land in the right year. Each worker hands back its hits as
+a ListingTable (listing_table.py), so results cross the process boundary
+as a few flat arrays; the driver merges them, applies the date, band and
+start-time filters over the columns, de-duplicates by the hash column and
+streams hits out in date order.
+
+Examples:
+  history.py query --band "green day" --venue "bottom of the hill" --last 1
+  history.py query --venue "el rio" --since 2025-03-01 --until 2025-05-31 --count
+  history.py query --venue "el rio" --after 10pm
+"""
+
+from __future__ import print_function
+import sys, os, re, glob, mmap, datetime as dt
+
+from duplicates import (eprint, DATE_HEADER_RE, MONTHS, parse_block, normalize_venue,
+                        year_for_next_occurrence, extract_first_time_minutes)
+from listing_table import ListingTable
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+SNAPSHOT_GLOBS = ('mylist-*.txt', 'livelist-*.txt')
+STAMP_RE = re.compile(r'-(\d{8})')
+SQUASH_RE = re.compile(b'[^a-z0-9]+')
+
+# DATE_HEADER_RE, but over bytes and anchored at any line start.
+DATE_HEADER_BRE = re.compile(
+    DATE_HEADER_RE.pattern.replace('^', r'^[ \t]*', 1).encode('ascii'),
+    re.IGNORECASE | re.MULTILINE)
+
+def snapshot_paths(data_dir):
+    paths = []
+    for pat in SNAPSHOT_GLOBS:
+        paths.extend(glob.glob(os.path.join(data_dir, pat)))
+    return sorted(paths)
+
+def snapshot_date(path):
+    """Date a snapshot was taken, from its YYYYMMDD stamp (else its mtime)."""
+    m = STAMP_RE.search(os.path.basename(path))
+    if m:
+        try:
+            return dt.datetime.strptime(m.group(1), '%Y%m%d').date()
+        except ValueError:
+            pass
+    return dt.date.fromtimestamp(os.path.getmtime(path))
+
+# --- worker side ---
+_resolver = None
+
+def _init_worker(venues_path):
+    global _resolver
+    if venues_path:
+        from venue_resolver import load_resolver
+        _resolver = load_resolver(venues_path)
+
+def snapshot_buffer(f):
+    """The snapshot's bytes: a read-only mmap, or the cleaned text for a saved HTML page."""
+    from live_stream import looks_like_html, clean_live_text
+    if os.fstat(f.fileno()).st_size == 0:
+        return b''
+    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if not looks_like_html(buf[:4096].decode('utf-8', 'replace')):
+        return buf
+    try:
+        return clean_live_text(buf[:].decode('utf-8', 'replace')).encode('utf-8')
+    finally:
+        buf.close()
+
+def iter_raw_blocks(buf):
+    """Yield (header match, bytes) for every date-header block in a buffer."""
+    heads = list(DATE_HEADER_BRE.finditer(buf))
+    for i, m in enumerate(heads):
+        end = heads[i + 1].start() if i + 1 < len(heads) else len(buf)
+        yield m, buf[m.start():end]
+
+def header_date_key(m, taken, cache):
+    """date_key for a header match without parsing the whole block."""
+    md = (m.group('mon').lower(), int(m.group('day')))
+    key = cache.get(md)
+    if key is None:
+        mon = MONTHS.index(md[0].decode('ascii')) + 1
+        key = "{:04d}-{:02d}-{:02d}".format(year_for_next_occurrence(mon, md[1], taken), mon, md[1])
+        cache[md] = key
+    return key
+
+def scan_snapshot(job):
+    """Return a ListingTable of the prefiltered hits in one file."""
+    path, q = job
+    table = ListingTable()
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return table
+    if not size:
+        return table
+    taken = snapshot_date(path)
+    band = q['band'].encode('utf-8') if q['band'] else None
+    venue_probe = q['venue_probe'].encode('utf-8') if q['venue_probe'] else None
+    # an unresolved venue is probed loosely: alphanumerics only ("elis" finds "Eli's")
+    squash = q['venue_id'] is None
+    dates = {}
+    source = os.path.basename(path)
+    with open(path, 'rb') as f:
+        buf = snapshot_buffer(f)
+        try:
+            for m, raw in iter_raw_blocks(buf):
+                if q['since'] or q['until']:
+                    date_key = header_date_key(m, taken, dates)
+                    if (q['since'] and date_key < q['since']) or (q['until'] and date_key > q['until']):
+                        continue
+                low = raw.lower()
+                if band is not None and band not in low:
+                    continue
+                if venue_probe is not None and venue_probe not in (SQUASH_RE.sub(b'', low) if squash else low):
+                    continue
+                lines = raw.decode('utf-8', 'replace').splitlines()
+                rec = parse_block(lines, _resolver, taken)
+                if not rec or not venue_matches(rec, q):
+                    continue
+                table.append(rec, source)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+    return table
+
+# --- driver side ---
+def run_query(paths, q, venues_path=None, jobs=None):
+    """Yield de-duplicated (date_key, hash, text, source) hits, sorted by date."""
+    jobs = jobs or os.cpu_count() or 1
+    work = [(p, q) for p in paths]
+    if jobs <= 1 or len(work) <= 1:
+        _init_worker(venues_path)
+        per_file = [scan_snapshot(w) for w in work]
+    else:
+        from multiprocessing import Pool
+        pool = Pool(min(jobs, len(work)), initializer=_init_worker, initargs=(venues_path,))
+        try:
+            per_file = pool.map(scan_snapshot, work)
+        finally:
+            pool.close(); pool.join()
+    table = ListingTable()
+    for part in per_file:
+        table.extend(part)
+    rows = table.select(since=q['since'], until=q['until'], band=q['band'],
+                        after=q.get('after'), before=q.get('before'))
+    rows.sort(key=lambda i: (table.date[i], table.hashes[i]))
+    for i in table.unique(rows):
+        yield table.date_key(i), table.hash_hex(i), table.full_text(i), table.source_name(i)
+
+def venue_probe_word(venue):
+    """Longest plain alphanumeric word of a venue's name, used as a byte prefilter."""
+    name = (venue['ln'].split(',')[0] + ' ' + venue['pn']).lower()
+    words = [w for w in name.split() if w.isalnum()]
+    return max(words, key=len) if words else None
+
+def loose_probe_word(text):
+    """Longest word of text with everything but a-z0-9 dropped: the unresolved-venue prefilter."""
+    words = [SQUASH_RE.sub(b'', w).decode('ascii') for w in text.lower().encode('utf-8').split()]
+    words = [w for w in words if w]
+    return max(words, key=len) if words else None
+
+def venue_matches(rec, q):
+    """The parsed record is at the queried venue (always true without --venue)."""
+    if q['venue_norm'] is None:
+        return True
+    if q['venue_id'] is not None and rec['venue_id'] is not None:
+        return rec['venue_id'] == q['venue_id']
+    return q['venue_norm'] in (rec['venue_norm'] or '')
+
+def clock_minutes(text):
+    """'10pm', '9:30pm' or '22:00' -> minutes after midnight."""
+    minutes = extract_first_time_minutes(text)
+    if minutes is not None:
+        return minutes
+    try:
+        h, m = text.split(':')
+        return int(h) * 60 + int(m)
+    except ValueError:
+        raise ValueError("bad time '{}' (use 10pm or 22:00)".format(text))
+
+def build_query(args):
+    venue_id = venue_probe = None
+    venue_norm = normalize_venue(args.venue) if args.venue else None
+    if args.venue and args.venues and os.path.exists(args.venues):
+        from venue_resolver import load_resolver
+        resolver = load_resolver(args.venues)
+        venue_id = resolver.resolve(args.venue) if resolver else None
+        if venue_id is not None:
+            venue_probe = venue_probe_word(resolver.venues[venue_id])
+    if args.venue and venue_id is None:
+        venue_probe = loose_probe_word(args.venue)
+    return {
+        'band': args.band.lower() if args.band else None,
+        'venue_norm': venue_norm,
+        'venue_id': venue_id,
+        'venue_probe': venue_probe,
+        'since': args.since,
+        'until': args.until,
+        'after': clock_minutes(args.after) if args.after else None,
+        'before': clock_minutes(args.before) if args.before else None,
+    }
+
+def cmd_query(args):
+    paths = snapshot_paths(args.data_dir)
+    if not paths:
+        eprint("No snapshots found in {}".format(args.data_dir)); return 1
+    try:
+        q = build_query(args)
+    except ValueError as ex:
+        eprint("Error: " + str(ex)); return 2
+    hits = run_query(paths, q, args.venues, args.jobs)
+    if args.count:
+        print(sum(1 for _ in hits))
+        return 0
+    if args.last:
+        hits = list(hits)[-args.last:]
+    for date_key, _, text, source in hits:
+        print("{}  [{}]".format(date_key, source))
+        print(text)
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='history.py')
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'),
+                    help='venues.xml (resolve --venue to an id)')
+    ap.add_argument('-j', '--jobs', type=int, default=None,
+                    help='worker processes (default: CPU count)')
+    sub = ap.add_subparsers(dest='cmd')
+
+    q = sub.add_parser('query', help='search listings across all snapshots')
+    q.add_argument('--band', help='band name (substring, case-insensitive)')
+    q.add_argument('--venue', help='venue name; resolved to a venue id when possible')
+    q.add_argument('--since', help='YYYY-MM-DD (inclusive)')
+    q.add_argument('--until', help='YYYY-MM-DD (inclusive)')
+    q.add_argument('--after', help='start time at or after (10pm, 22:00)')
+    q.add_argument('--before', help='start time at or before')
+    q.add_argument('--last', type=int, default=0, help='only the N most recent hits')
+    q.add_argument('--count', action='store_true', help='print only the number of hits')
+    q.set_defaults(func=cmd_query)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ledger.py — which listings have already been sent in a write-out.
+
+data/submitted.json maps each submitted listing's hash (listing_hash:
+date + normalized text) to the day it went out and its show slot
+(date, venue, start time). The write-out records the archived list once a
+write-out completes; the next write-out splits mylist in one pass over
+the hash set:
+
+  submitted  same hash as a listing already sent          -> no dupe check
+  changed    new text for a slot that was already sent    -> checked
+  new        everything else                              -> checked
+
+so the dupe check and review only see what changed since the last
+write-out. Shows whose date has passed are dropped from the ledger
+whenever it is written.
+
+Usage:
+  ledger.py record ../../data/mylist-20261019.txt
+  ledger.py partition ../../data/mylist.txt [--show]
+  ledger.py forget ../../data/mylist.txt      # resend these listings
+"""
+
+from __future__ import print_function
+import sys, os, json, datetime as dt
+
+from duplicates import eprint, parse_mylist, listing_hash, venue_key
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+LEDGER_FILE = 'submitted.json'
+
+def slot_key(rec):
+    kind, value = venue_key(rec)
+    return '{}|{}:{}|{}'.format(rec['date_key'], kind, value, rec['time_min'])
+
+class Ledger(object):
+    """Submitted listings by hash, plus the slots they occupy."""
+
+    def __init__(self, path):
+        self.path = path
+        self.listings = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.listings = json.load(f).get('listings', {})
+            except Exception as ex:
+                eprint("Warning: could not read {} ({}); treating every listing as new.".format(path, ex))
+        self.slots = set(v['slot'] for v in self.listings.values())
+
+    def partition(self, entries):
+        """Split parsed entries into (new, changed, submitted) lists."""
+        new, changed, submitted = [], [], []
+        for e in entries:
+            if listing_hash(e) in self.listings:
+                submitted.append(e)
+            elif slot_key(e) in self.slots:
+                changed.append(e)
+            else:
+                new.append(e)
+        return new, changed, submitted
+
+    def record(self, entries, when=None):
+        when = (when or dt.date.today()).isoformat()
+        added = 0
+        for e in entries:
+            h = listing_hash(e)
+            if h not in self.listings:
+                added += 1
+            self.listings[h] = {'date': e['date_key'], 'slot': slot_key(e), 'sent': when}
+            self.slots.add(slot_key(e))
+        return added
+
+    def forget(self, entries):
+        n = 0
+        for e in entries:
+            if self.listings.pop(listing_hash(e), None) is not None:
+                n += 1
+        self.slots = set(v['slot'] for v in self.listings.values())
+        return n
+
+    def save(self, today=None):
+        from bands_abbrev import atomic_write
+        today = (today or dt.date.today()).isoformat()
+        self.listings = dict((h, v) for h, v in self.listings.items() if v['date'] >= today)
+        self.slots = set(v['slot'] for v in self.listings.values())
+        atomic_write(self.path, json.dumps({'version': 1, 'listings': self.listings},
+                                           indent=1, sort_keys=True))
+
+def _entries(args, path):
+    from venue_resolver import load_resolver
+    with open(path, 'r') as f:
+        return parse_mylist(f.read(), load_resolver(args.venues))
+
+def cmd_record(args):
+    ledger = Ledger(args.ledger)
+    added = ledger.record(_entries(args, args.file))
+    ledger.save()
+    eprint("Ledger: {} new submitted listing(s), {} tracked.".format(added, len(ledger.listings)))
+    return 0
+
+def cmd_partition(args):
+    new, changed, submitted = Ledger(args.ledger).partition(_entries(args, args.file))
+    print("new: {}  changed: {}  submitted: {}".format(len(new), len(changed), len(submitted)))
+    if args.show:
+        for label, group in (('NEW', new), ('CHANGED', changed)):
+            for e in group:
+                print("{:8s} {}".format(label, e['full_text'].splitlines()[0]))
+    return 0
+
+def cmd_forget(args):
+    ledger = Ledger(args.ledger)
+    n = ledger.forget(_entries(args, args.file))
+    ledger.save()
+    eprint("Ledger: forgot {} listing(s).".format(n))
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='ledger.py')
+    ap.add_argument('--ledger', default=os.path.join(DATA_DIR, LEDGER_FILE))
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    sub = ap.add_subparsers(dest='cmd')
+
+    r = sub.add_parser('record', help='mark every listing in FILE as submitted today')
+    r.add_argument('file')
+    r.set_defaults(func=cmd_record)
+
+    p = sub.add_parser('partition', help='count new / changed / submitted listings in FILE')
+    p.add_argument('file')
+    p.add_argument('--show', action='store_true', help='list the new and changed listings')
+    p.set_defaults(func=cmd_partition)
+
+    f = sub.add_parser('forget', help='drop the listings in FILE from the ledger')
+    f.add_argument('file')
+    f.set_defaults(func=cmd_forget)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
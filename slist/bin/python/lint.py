@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lint.py — check whole list files for malformed listings in one pass.
+
+Reads mylist.txt / needs_review.txt style files (two lines per listing,
+second line indented 7 spaces) and reports every problem with its line
+number, using the same header regex, time parser and venue resolver as
+the rest of the tools:
+
+  orphan-line    error    a non-header line where a listing should start
+  missing-line2  error    a header with no second line
+  bad-date       error    a month/day that does not exist (feb 30)
+  weekday        error    the weekday does not match the date
+  invalid-time   error    smarttime's "invalid" made it into the listing
+  no-venue       error    no " at <venue>" on the second line
+  unknown-venue  warning  venue text not found in venues.xml
+  no-time        warning  no start time
+  header-format  fixable  header not "mon dd dow" (lowercase, day padded, thr)
+  indent         fixable  second line not indented exactly 7 spaces
+  whitespace     fixable  trailing whitespace
+
+--fix rewrites the file (atomically) with the fixable problems corrected;
+nothing else is ever changed. --json prints the findings as a JSON list.
+--flagged writes the header line of every listing that still has an
+error or warning; the write-out uses the same set for WO_REVIEW=flagged.
+Exit status is 1 when errors remain.
+
+Usage:
+  lint.py ../../data/mylist.txt ../../data/needs_review.txt
+  lint.py --fix --json ../../data/needs_review.txt
+  lint.py --fix --flagged /tmp/flagged.txt ../../data/needs_review.txt
+"""
+
+from __future__ import print_function
+import sys, os, re, json, datetime as dt
+
+from duplicates import DATE_HEADER_RE, MONTHS, TIME_TOKEN_RE, year_for_next_occurrence
+from filter_future_only import dow_abbr
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+INDENT = '       '   # second-line indentation (7 spaces)
+INVALID_RE = re.compile(r'\binvalid\b', re.IGNORECASE)
+HEADER_FIX_RE = re.compile(r'^\s*(?P<mon>[a-z]{3})\s+(?P<day>\d{1,2})\s+(?P<dow>[a-z]{3})\b(?P<rest>.*)$',
+                           re.IGNORECASE)
+
+ERROR, WARNING, FIXABLE = 'error', 'warning', 'fixable'
+
+def finding(path, line, code, severity, message):
+    return {'file': path, 'line': line, 'code': code, 'severity': severity, 'message': message}
+
+def canonical_header(line):
+    """line with its date header rewritten as 'mon dd dow'; None if not a header."""
+    m = HEADER_FIX_RE.match(line)
+    if not m or m.group('mon').lower() not in MONTHS:
+        return None
+    dow = m.group('dow').lower()
+    dow = 'thr' if dow == 'thu' else dow
+    return "{} {:2} {}{}".format(m.group('mon').lower(), int(m.group('day')), dow,
+                                  m.group('rest').rstrip())
+
+def is_header(line):
+    fixed = canonical_header(line)
+    return fixed is not None and DATE_HEADER_RE.match(fixed) is not None
+
+def check_date(path, n, header, today):
+    m = DATE_HEADER_RE.match(header)
+    mon, day = MONTHS.index(m.group('mon')) + 1, int(m.group('day'))
+    year = year_for_next_occurrence(mon, day, today)
+    dates = []
+    for y in (year, year - 1):
+        try:
+            dates.append(dt.date(y, mon, day))
+        except ValueError:
+            pass
+    if not dates:
+        return [finding(path, n, 'bad-date', ERROR, "{} {} is not a date".format(m.group('mon'), day))]
+    if all(dow_abbr(d) != m.group('dow') for d in dates):
+        return [finding(path, n, 'weekday', ERROR, "{} {} is a {} ({}), not {}".format(
+            m.group('mon'), day, dow_abbr(dates[0]), dates[0].year, m.group('dow')))]
+    return []
+
+def check_line2(path, n, line2, resolver):
+    text = line2.strip()
+    low = text.lower()
+    if low.startswith('at '):
+        venue = text[3:]
+    elif ' at ' in low:
+        venue = text[low.rfind(' at ') + 4:]
+    else:
+        return [finding(path, n, 'no-venue', ERROR, "no 'at <venue>' on the second line")]
+    if resolver is not None and resolver.resolve(venue) is None:
+        return [finding(path, n, 'unknown-venue', WARNING, "venue not in venues.xml: " + venue)]
+    return []
+
+def lint_lines(path, lines, resolver=None, today=None):
+    """Return (findings, fixed_lines) for one file's lines."""
+    today = today or dt.date.today()
+    findings = []
+    fixed = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        n = i + 1
+        if not line.strip():
+            fixed.append(line); i += 1
+            continue
+        if not is_header(line):
+            findings.append(finding(path, n, 'orphan-line', ERROR,
+                                    "expected a date header: {}".format(line.strip())))
+            fixed.append(line); i += 1
+            continue
+
+        header = canonical_header(line)
+        if header != line:
+            findings.append(finding(path, n, 'header-format', FIXABLE,
+                                    "header should start '{}'".format(header[:10])))
+        fixed.append(header)
+        findings += check_date(path, n, header.lower(), today)
+
+        nxt = lines[i + 1] if i + 1 < len(lines) else ''
+        if not nxt.strip() or is_header(nxt):
+            findings.append(finding(path, n, 'missing-line2', ERROR, "listing has no second line"))
+            block = header
+            i += 1
+        else:
+            line2 = INDENT + nxt.strip()
+            if nxt.rstrip() != line2:
+                findings.append(finding(path, n + 1, 'indent', FIXABLE,
+                                        "second line must start with 7 spaces"))
+            elif nxt != nxt.rstrip():
+                findings.append(finding(path, n + 1, 'whitespace', FIXABLE, "trailing whitespace"))
+            fixed.append(line2)
+            findings += check_line2(path, n + 1, nxt, resolver)
+            block = header + ' ' + nxt
+            i += 2
+
+        if INVALID_RE.search(block):
+            findings.append(finding(path, n, 'invalid-time', ERROR, "time was entered as 'invalid'"))
+        elif not TIME_TOKEN_RE.search(block):
+            findings.append(finding(path, n, 'no-time', WARNING, "no start time"))
+    findings.sort(key=lambda f: f['line'])
+    return findings, fixed
+
+def lint_file(path, resolver=None, fix=False, today=None):
+    with open(path, 'r') as f:
+        lines = [l.rstrip('\n') for l in f]
+    findings, fixed = lint_lines(path, lines, resolver, today)
+    if fix and fixed != lines:
+        from bands_abbrev import atomic_write
+        atomic_write(path, ''.join(l + '\n' for l in fixed))
+    return findings
+
+def flagged_headers(findings, lines):
+    """First lines of the listings that still have errors or warnings."""
+    out = set()
+    for f in findings:
+        if f['severity'] == FIXABLE:
+            continue
+        n = f['line'] - 1
+        while n > 0 and not is_header(lines[n]):
+            n -= 1
+        out.add(lines[n])
+    return out
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='lint.py')
+    ap.add_argument('files', nargs='+')
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    ap.add_argument('--fix', action='store_true', help='correct the fixable problems in place')
+    ap.add_argument('--json', action='store_true', help='print findings as JSON')
+    ap.add_argument('--flagged', metavar='FILE',
+                    help='also write the header lines of listings with errors/warnings to FILE')
+    args = ap.parse_args()
+
+    from venue_resolver import load_resolver
+    resolver = load_resolver(args.venues)
+    findings = []
+    flagged = []
+    for path in args.files:
+        if not os.path.exists(path):
+            continue
+        found = lint_file(path, resolver, args.fix)
+        if args.flagged:
+            with open(path, 'r') as f:
+                flagged += sorted(flagged_headers(found, [l.rstrip('\n') for l in f]))
+        findings += found
+    if args.flagged:
+        with open(args.flagged, 'w') as f:
+            f.write(''.join(h + '\n' for h in flagged))
+
+    if args.fix:
+        findings = [f for f in findings if f['severity'] != FIXABLE]
+    if args.json:
+        print(json.dumps(findings, indent=1))
+    else:
+        for f in findings:
+            print("{file}:{line}: {severity}: {code}: {message}".format(**f))
+    return 1 if any(f['severity'] == ERROR for f in findings) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+listing_table.py — column-oriented store for many parsed listings.
+
+parse_block gives one dict per listing, which is fine for a single list
+but heavy across every archived snapshot. A ListingTable keeps the same
+fields as flat columns instead:
+
+  date      array('i')  date ordinal (datetime.date.toordinal)
+  venue     array('i')  venues.xml id, -1 when unresolved
+  vnorm     array('i')  interned normalized venue text
+  time      array('i')  start minutes, -1 when unknown
+  hashes    array('Q')  listing_hash as an integer
+  source    array('i')  interned snapshot name
+  band_ptr / band_ids   bands in CSR form (row i owns band_ids[band_ptr[i]:band_ptr[i+1]])
+  text / text_ptr       all listing text in one UTF-8 buffer plus offsets
+
+select() filters on date range, venue set, time window and band in one
+pass over the columns; with NumPy installed it runs as array operations
+over the same buffers, otherwise as plain loops.
+
+Usage:
+  listing_table.py stats ../../data/livelist-*.txt
+"""
+
+from __future__ import print_function
+import sys, os, datetime as dt
+from array import array
+
+from duplicates import parse_plain_list, listing_hash
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+NONE = -1
+_np = []   # numpy, imported on the first select() (it alone would bust the import budget)
+
+def numpy_or_none():
+    if not _np:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _np.append(numpy)
+    return _np[0]
+
+def _ordinal(d):
+    if d is None or isinstance(d, int):
+        return d
+    if isinstance(d, str):
+        d = dt.datetime.strptime(d, '%Y-%m-%d').date()
+    return d.toordinal()
+
+class Interner(object):
+    """Strings <-> small ints."""
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def get(self, name):
+        return self.index.get(name)
+
+class ListingTable(object):
+    """Parsed listings held as array columns; rows are addressed by index."""
+
+    def __init__(self):
+        self.date = array('i')
+        self.venue = array('i')
+        self.vnorm = array('i')
+        self.time = array('i')
+        self.hashes = array('Q')
+        self.source = array('i')
+        self.band_ptr = array('i', [0])
+        self.band_ids = array('i')
+        self.text = bytearray()
+        self.text_ptr = array('q', [0])
+        self.bands = Interner()
+        self.venue_names = Interner()
+        self.sources = Interner()
+
+    def __len__(self):
+        return len(self.date)
+
+    # --- building ---
+    def append(self, rec, source=''):
+        """Add one parse_block record."""
+        self.date.append(_ordinal(rec['date_key']))
+        self.venue.append(NONE if rec['venue_id'] is None else rec['venue_id'])
+        self.vnorm.append(self.venue_names.add(rec['venue_norm'] or ''))
+        self.time.append(NONE if rec['time_min'] is None else rec['time_min'])
+        self.hashes.append(int(listing_hash(rec), 16))
+        self.source.append(self.sources.add(source))
+        self.band_ids.extend(self.bands.add(b) for b in rec['bands'])
+        self.band_ptr.append(len(self.band_ids))
+        self.text += rec['full_text'].encode('utf-8')
+        self.text_ptr.append(len(self.text))
+
+    def add_text(self, text, resolver=None, today=None, source=''):
+        """Parse a whole list (live or mylist format) into the table."""
+        for rec in parse_plain_list(text, resolver, today):
+            self.append(rec, source)
+        return self
+
+    def extend(self, other):
+        """Append every row of another table, remapping its interned ids."""
+        bands = [self.bands.add(n) for n in other.bands.names]
+        vnames = [self.venue_names.add(n) for n in other.venue_names.names]
+        sources = [self.sources.add(n) for n in other.sources.names]
+        self.date.extend(other.date)
+        self.venue.extend(other.venue)
+        self.time.extend(other.time)
+        self.hashes.extend(other.hashes)
+        self.vnorm.extend(vnames[i] for i in other.vnorm)
+        self.source.extend(sources[i] for i in other.source)
+        base = self.band_ptr[-1]
+        self.band_ptr.extend(base + p for p in other.band_ptr[1:])
+        self.band_ids.extend(bands[i] for i in other.band_ids)
+        base = self.text_ptr[-1]
+        self.text_ptr.extend(base + p for p in other.text_ptr[1:])
+        self.text += other.text
+        return self
+
+    # --- reading rows ---
+    def full_text(self, i):
+        return self.text[self.text_ptr[i]:self.text_ptr[i + 1]].decode('utf-8')
+
+    def date_key(self, i):
+        return dt.date.fromordinal(self.date[i]).isoformat()
+
+    def hash_hex(self, i):
+        return '{:016x}'.format(self.hashes[i])
+
+    def source_name(self, i):
+        return self.sources.names[self.source[i]]
+
+    def row_bands(self, i):
+        names = self.bands.names
+        return [names[b] for b in self.band_ids[self.band_ptr[i]:self.band_ptr[i + 1]]]
+
+    def record(self, i):
+        """Row i as a parse_block-style dict."""
+        return {
+            'date_key': self.date_key(i),
+            'venue_norm': self.venue_names.names[self.vnorm[i]] or None,
+            'venue_id': None if self.venue[i] == NONE else self.venue[i],
+            'time_min': None if self.time[i] == NONE else self.time[i],
+            'bands': self.row_bands(i),
+            'full_text': self.full_text(i),
+        }
+
+    def nbytes(self):
+        cols = (self.date, self.venue, self.vnorm, self.time, self.hashes, self.source,
+                self.band_ptr, self.band_ids, self.text_ptr)
+        return sum(c.itemsize * len(c) for c in cols) + len(self.text)
+
+    # --- filtering ---
+    def band_matches(self, needle):
+        """Interned band ids whose name contains needle (case-insensitive)."""
+        needle = needle.lower()
+        return set(i for i, n in enumerate(self.bands.names) if needle in n)
+
+    def select(self, since=None, until=None, venues=None, after=None, before=None, band=None):
+        """Row indices passing every given filter, in table order.
+
+        since/until: dates (inclusive; date, ordinal or YYYY-MM-DD)
+        venues:      venues.xml ids
+        after/before: start-time window in minutes (rows without a time are dropped)
+        band:        substring of a band name
+        """
+        since, until = _ordinal(since), _ordinal(until)
+        band_set = self.band_matches(band) if band else None
+        np = numpy_or_none()
+        if np is not None:
+            return self._select_np(np, since, until, venues, after, before, band_set)
+        rows = range(len(self))
+        date, time, venue = self.date, self.time, self.venue
+        if since is not None:
+            rows = [i for i in rows if date[i] >= since]
+        if until is not None:
+            rows = [i for i in rows if date[i] <= until]
+        if venues is not None:
+            venues = set(venues)
+            rows = [i for i in rows if venue[i] in venues]
+        if after is not None:
+            rows = [i for i in rows if time[i] != NONE and time[i] >= after]
+        if before is not None:
+            rows = [i for i in rows if time[i] != NONE and time[i] <= before]
+        if band_set is not None:
+            ptr, ids = self.band_ptr, self.band_ids
+            rows = [i for i in rows if any(b in band_set for b in ids[ptr[i]:ptr[i + 1]])]
+        return list(rows)
+
+    def _select_np(self, np, since, until, venues, after, before, band_set):
+        n = len(self)
+        if not n:
+            return []
+        mask = np.ones(n, dtype=bool)
+        date = np.frombuffer(self.date, dtype=np.int32)
+        time = np.frombuffer(self.time, dtype=np.int32)
+        if since is not None:
+            mask &= date >= since
+        if until is not None:
+            mask &= date <= until
+        if venues is not None:
+            mask &= np.isin(np.frombuffer(self.venue, dtype=np.int32), list(venues))
+        if after is not None:
+            mask &= (time != NONE) & (time >= after)
+        if before is not None:
+            mask &= (time != NONE) & (time <= before)
+        if band_set is not None:
+            ids = np.frombuffer(self.band_ids, dtype=np.int32)
+            pos = np.nonzero(np.isin(ids, list(band_set)))[0]
+            ptr = np.frombuffer(self.band_ptr, dtype=np.int32)
+            has_band = np.zeros(n, dtype=bool)
+            has_band[np.searchsorted(ptr, pos, side='right') - 1] = True
+            mask &= has_band
+        return np.nonzero(mask)[0].tolist()
+
+    def unique(self, rows):
+        """rows with repeated listing hashes dropped (first one kept)."""
+        seen = set()
+        out = []
+        hashes = self.hashes
+        for i in rows:
+            h = hashes[i]
+            if h not in seen:
+                seen.add(h)
+                out.append(i)
+        return out
+
+def load_files(paths, resolver=None):
+    """One table over several snapshot files (years inferred per snapshot)."""
+    from history import snapshot_date
+    from live_stream import clean_live_text
+    table = ListingTable()
+    for path in paths:
+        with open(path, 'r') as f:
+            text = clean_live_text(f.read())
+        table.add_text(text, resolver, snapshot_date(path), os.path.basename(path))
+    return table
+
+def cmd_stats(args):
+    from venue_resolver import load_resolver
+    table = load_files(args.files, load_resolver(args.venues))
+    rows = table.unique(range(len(table)))
+    print("{} listings ({} distinct) from {} file(s)".format(len(table), len(rows), len(args.files)))
+    print("{} bands, {} venue spellings".format(len(table.bands), len(table.venue_names)))
+    print("{:.1f} KiB in columns and text ({})".format(
+        table.nbytes() / 1024.0, 'numpy filters' if numpy_or_none() is not None else 'stdlib filters'))
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='listing_table.py')
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    sub = ap.add_subparsers(dest='cmd')
+
+    s = sub.add_parser('stats', help='load snapshot files and report table size')
+    s.add_argument('files', nargs='+')
+    s.set_defaults(func=cmd_stats)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
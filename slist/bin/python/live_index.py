@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+live_index.py — in-memory (date, venue, time) index of the live list.
+
+g.sh starts `live_index.py serve` as a coproc when a session begins. The
+live list is loaded in a background thread (newest livelist-*.txt under
+12h old, otherwise fetched from stevelist.com and cached the same way
+wo.sh does), so it is ready by the time the first event is confirmed.
+
+Protocol (one query per line on stdin):
+  query : the formatted event, its two lines joined with a TAB
+  reply : a count line, then that many matching live listings with
+          their newlines flattened to " / ".
+          A count of -1 means the live list is not available (yet).
+"""
+
+from __future__ import print_function
+import sys, os, glob, time, threading
+
+from duplicates import (eprint, parse_block, build_cluster, auto_resolve, load_rules,
+                        load_venues_dict, venue_key, LazyLiveList, DEFAULT_RULES, RULES_FILE)
+from venue_resolver import load_resolver
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+LIVE_URL = 'https://stevelist.com/list'
+LIVE_BASENAME_PREFIX = 'livelist'
+LIVE_MAX_AGE_SECS = 12 * 60 * 60   # same 12h cache window as wo.sh
+
+def find_live_cache(data_dir, max_age=LIVE_MAX_AGE_SECS):
+    """Return the newest livelist-*.txt younger than max_age, else None."""
+    paths = glob.glob(os.path.join(data_dir, LIVE_BASENAME_PREFIX + '-*.txt'))
+    if not paths:
+        return None
+    newest = max(paths, key=os.path.getmtime)
+    if time.time() - os.path.getmtime(newest) < max_age and os.path.getsize(newest) > 0:
+        return newest
+    return None
+
+def stream_live_list(url, data_dir, resolver=None):
+    """Fetch and parse the live list in one streaming pass.
+
+    Listings are parsed as their blocks arrive; the clean text is cached
+    as data_dir/livelist-YYYYMMDDHHMM.txt for wo.sh and later sessions.
+    """
+    from live_stream import iter_url_blocks, format_block
+    out = os.path.join(data_dir, '{}-{}.txt'.format(
+        LIVE_BASENAME_PREFIX, time.strftime('%Y%m%d%H%M')))
+    tmp = out + '.part'
+    entries = []
+    try:
+        with open(tmp, 'w') as f:
+            for block in iter_url_blocks(url):
+                f.write(format_block(block))
+                rec = parse_block(block, resolver)
+                if rec and rec['venue_norm']:
+                    entries.append(rec)
+        os.replace(tmp, out)
+    except Exception:
+        try: os.remove(tmp)
+        except Exception: pass
+        raise
+    return entries
+
+class LiveIndex(object):
+    """Live entries bucketed by (date_key, venue_key); dates are parsed as queried."""
+
+    def __init__(self, live_entries, venues_map=None, resolver=None, rules=None):
+        self.venues_map = venues_map or {}
+        self.resolver = resolver
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        if not isinstance(live_entries, LazyLiveList):
+            live_entries = LazyLiveList.from_entries(live_entries)
+        self.live = live_entries
+        self.size = len(live_entries)
+
+    def matches(self, event_text):
+        """Return live entries that look like a dupe of a formatted event, best first.
+
+        Uses the write-out's rules, so a cluster it would keep without asking
+        (e.g. a different lineup at a <multiple> venue) is not reported here.
+        """
+        rec = parse_block(event_text.splitlines(), self.resolver)
+        if not rec or not rec['venue_norm']:
+            return []
+        is_mult = self.venues_map.get(venue_key(rec), False)
+        if is_mult and self.rules.get('multiple_venues') == 'keep':
+            return []
+        cluster = build_cluster(rec, self.live.candidates(rec['date_key'], venue_key(rec)))
+        if cluster is None:
+            return []
+        rule = auto_resolve(cluster, is_mult, self.rules)
+        if rule is not None and rule[0] == 'n':
+            return []
+        return cluster['candidates']
+
+def load_index(data_dir, url, venues_path):
+    resolver = load_resolver(venues_path)
+    path = find_live_cache(data_dir)
+    if path is None:
+        live_entries = stream_live_list(url, data_dir, resolver)
+    else:
+        from live_stream import clean_live_text
+        with open(path, 'r') as f:
+            live_entries = LazyLiveList(clean_live_text(f.read()), resolver)
+    venues_map = load_venues_dict(venues_path) if venues_path else {}
+    return LiveIndex(live_entries, venues_map, resolver, load_rules(os.path.join(data_dir, RULES_FILE)))
+
+def serve(args):
+    state = {'index': None}
+
+    def worker():
+        try:
+            state['index'] = load_index(args.data_dir, args.url, args.venues)
+        except Exception as ex:
+            eprint("live_index: could not load live list: " + str(ex))
+
+    loader = threading.Thread(target=worker)
+    loader.daemon = True
+    loader.start()
+
+    out = sys.stdout
+    for line in sys.stdin:
+        query = line.rstrip('\n')
+        if not query.strip():
+            continue
+        loader.join(args.wait)
+        index = state['index']
+        if index is None:
+            out.write("-1\n")
+        else:
+            hits = index.matches(query.replace('\t', '\n'))
+            out.write("{}\n".format(len(hits)))
+            for h in hits:
+                out.write(' / '.join(l.strip() for l in h['full_text'].splitlines()) + "\n")
+        out.flush()
+    return 0
+
+def check(args):
+    index = load_index(args.data_dir, args.url, args.venues)
+    hits = index.matches(args.event.replace('\t', '\n'))
+    for h in hits:
+        print(h['full_text'])
+    return 1 if hits else 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='live_index.py')
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--url', default=LIVE_URL)
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'),
+                    help='venues.xml (for <multiple> venues)')
+    sub = ap.add_subparsers(dest='cmd')
+
+    s = sub.add_parser('serve', help='answer dupe queries on stdin (g.sh coproc)')
+    s.add_argument('--wait', type=float, default=10.0,
+                   help='seconds a query waits for the live list to finish loading')
+    s.set_defaults(func=serve)
+
+    c = sub.add_parser('check', help='one-shot dupe check of a formatted event')
+    c.add_argument('event', help='formatted event (lines joined by newline or TAB)')
+    c.set_defaults(func=check)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+live_stream.py — streaming HTML-to-listing extractor for the live list.
+
+ListingExtractor is an html.parser.HTMLParser that is fed chunks as they
+come off the socket and hands back finished listing blocks (lists of
+clean text lines) as soon as the next date header shows up, so parsing
+overlaps the download. Tags are dropped, block-level tags become line
+breaks, entities are decoded, and anything before the first date header
+(page chrome) is ignored.
+
+Usage:
+  live_stream.py fetch [URL] -o livelist-YYYYMMDDHHMM.txt
+  live_stream.py clean saved-page.html > livelist.txt
+"""
+
+from __future__ import print_function
+import sys, codecs
+
+from html.parser import HTMLParser
+
+from duplicates import DATE_HEADER_RE
+
+LIVE_URL = 'https://stevelist.com/list'
+CHUNK_SIZE = 16 * 1024
+
+BREAK_TAGS = frozenset(['br', 'p', 'div', 'li', 'tr', 'td', 'pre', 'hr', 'table',
+                        'ul', 'ol', 'dl', 'dt', 'dd', 'h1', 'h2', 'h3', 'h4', 'h5',
+                        'h6', 'blockquote', 'section', 'article', 'body'])
+SKIP_TAGS = frozenset(['script', 'style', 'head', 'title', 'noscript'])
+
+def looks_like_html(text):
+    head = text[:4096].lower()
+    return '<html' in head or '<body' in head or '<br' in head or '<pre' in head or '<!doctype' in head
+
+class ListingExtractor(HTMLParser):
+    """Incremental tag/entity stripper that groups lines into listing blocks."""
+
+    def __init__(self):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self._skip = 0
+        self._line = []
+        self._block = []
+        self._ready = []
+
+    # --- HTMLParser hooks ---
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in BREAK_TAGS:
+            self._break()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BREAK_TAGS:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in BREAK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        parts = data.split('\n')
+        for i, part in enumerate(parts):
+            if i:
+                self._break()
+            if part:
+                self._line.append(part)
+
+    # --- line/block assembly ---
+    def _break(self):
+        line = ''.join(self._line).replace('\xa0', ' ').replace('\r', '').rstrip()
+        self._line = []
+        if not line.strip():
+            return
+        if DATE_HEADER_RE.match(line.strip()):
+            if self._block:
+                self._ready.append(self._block)
+            self._block = [line]
+        elif self._block:
+            self._block.append(line)
+
+    def feed_chunk(self, text):
+        """Feed decoded text; return the blocks completed by it."""
+        self.feed(text)
+        ready, self._ready = self._ready, []
+        return ready
+
+    def finish(self):
+        """Flush buffered text; return the remaining blocks."""
+        self.close()
+        self._break()
+        if self._block:
+            self._ready.append(self._block)
+            self._block = []
+        ready, self._ready = self._ready, []
+        return ready
+
+def iter_blocks(chunks, encoding='utf-8'):
+    """Yield listing blocks from an iterable of bytes or str chunks."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    ex = ListingExtractor()
+    for chunk in chunks:
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        for block in ex.feed_chunk(text):
+            yield block
+    for block in ex.feed_chunk(decoder.decode(b'', final=True)):
+        yield block
+    for block in ex.finish():
+        yield block
+
+def iter_response_chunks(resp, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = resp.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def iter_url_blocks(url, timeout=20, chunk_size=CHUNK_SIZE):
+    """Yield listing blocks from a URL while it downloads."""
+    from urllib.request import urlopen
+    resp = urlopen(url, timeout=timeout)
+    try:
+        charset = resp.headers.get_content_charset() or 'utf-8'
+        for block in iter_blocks(iter_response_chunks(resp, chunk_size), charset):
+            yield block
+    finally:
+        resp.close()
+
+def html_to_text(text):
+    """Clean an already-downloaded page into plain listing text."""
+    return ''.join(format_block(b) for b in iter_blocks([text]))
+
+def clean_live_text(text):
+    """Return text unchanged if it is plain, else its listing text."""
+    return html_to_text(text) if looks_like_html(text) else text
+
+def format_block(block):
+    return '\n'.join(block) + '\n'
+
+def cmd_fetch(args):
+    out = open(args.output, 'w') if args.output else sys.stdout
+    n = 0
+    try:
+        for block in iter_url_blocks(args.url):
+            out.write(format_block(block))
+            n += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    sys.stderr.write("Fetched {} listings.\n".format(n))
+    return 0 if n else 1
+
+def cmd_clean(args):
+    with open(args.path, 'rb') as f:
+        for block in iter_blocks(iter_response_chunks(f)):
+            sys.stdout.write(format_block(block))
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='live_stream.py')
+    sub = ap.add_subparsers(dest='cmd')
+
+    f = sub.add_parser('fetch', help='stream the live list to clean listing text')
+    f.add_argument('url', nargs='?', default=LIVE_URL)
+    f.add_argument('-o', '--output')
+    f.set_defaults(func=cmd_fetch)
+
+    c = sub.add_parser('clean', help='strip markup from a saved page')
+    c.add_argument('path')
+    c.set_defaults(func=cmd_clean)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+multiple_learner.py — learn which venues host several shows a day.
+
+Every livelist-*.txt snapshot in the data dir is read once (the names of
+the ones already seen are kept in data/multiple_learner.json). For each
+resolved venue the learner keeps, per show date, whether one snapshot
+listed two distinct shows there that day: start times more than an hour
+apart, or two non-empty lineups that share no band. Listings are only
+compared within a snapshot, so a show whose time moves or whose lineup
+is re-spelled between snapshots stays one show. A venue's confidence is
+
+    dates with 2+ distinct listings / dates with any listing
+
+over the last WINDOW_DAYS. Venues with at least --min-dates show dates
+and --min-confidence get <multiple>true</multiple> in venues.xml, all in
+one atomic rewrite, so duplicates.py stops prompting for them. The ids
+the learner flagged are remembered; when such a venue has --min-dates
+of evidence but its confidence drops below the threshold, apply takes
+the flag off again. `retract` takes them off on request and keeps the
+learner from setting them again. Flags set by hand are never touched.
+
+Usage:
+  multiple_learner.py learn [--apply]    # read new snapshots (the write-out runs this)
+  multiple_learner.py suggest            # confidence table
+  multiple_learner.py apply [--dry-run]
+  multiple_learner.py retract [ID ...]   # undo learner-set flags (all of them by default)
+"""
+
+from __future__ import print_function
+import sys, os, json, datetime as dt
+
+from duplicates import eprint, parse_plain_list
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+STATE_FILE = 'multiple_learner.json'
+WINDOW_DAYS = 365
+MIN_DATES = 4
+MIN_CONFIDENCE = 0.5
+TRUE_VALUES = ('true', '1', 'yes', 'y')
+
+STATE_VERSION = 2
+
+def empty_state():
+    return {'version': STATE_VERSION, 'seen': [], 'venues': {}, 'flagged': [], 'retracted': []}
+
+def load_state(path):
+    if not os.path.exists(path):
+        return empty_state()
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+    except Exception as ex:
+        eprint("Warning: could not read {} ({}); starting fresh.".format(path, ex))
+        return empty_state()
+    if state.get('version') != STATE_VERSION:
+        # Version 1 pooled listings across snapshots; relearn from the snapshots on disk
+        eprint("Note: {} is from an older version; relearning from the snapshots.".format(path))
+        fresh = empty_state()
+        fresh['flagged'] = state.get('flagged', [])
+        fresh['retracted'] = state.get('retracted', [])
+        return fresh
+    return state
+
+def save_state(path, state, today=None):
+    from bands_abbrev import atomic_write
+    cutoff = ((today or dt.date.today()) - dt.timedelta(days=WINDOW_DAYS)).isoformat()
+    for vid in list(state['venues']):
+        dates = state['venues'][vid]
+        for date_key in [d for d in dates if d < cutoff]:
+            del dates[date_key]
+        if not dates:
+            del state['venues'][vid]
+    atomic_write(path, json.dumps(state, sort_keys=True))
+
+def distinct(a, b):
+    """Two (time_min, bands) listings at one venue/date that are different shows."""
+    if a[0] is not None and b[0] is not None and abs(a[0] - b[0]) > 60:
+        return True
+    if not a[1] or not b[1]:
+        return False    # no lineup to compare
+    return not set(a[1]) & set(b[1])
+
+def learn_snapshot(state, path, resolver):
+    """Fold one snapshot into the state; returns the number of listings used."""
+    from history import snapshot_date
+    from live_stream import clean_live_text
+    with open(path, 'r') as f:
+        text = clean_live_text(f.read())
+    shows = {}
+    used = 0
+    for rec in parse_plain_list(text, resolver, snapshot_date(path)):
+        if rec['venue_id'] is None:
+            continue
+        shows.setdefault((str(rec['venue_id']), rec['date_key']), []).append(
+            (rec['time_min'], sorted(rec['bands'])))
+        used += 1
+    for (vid, date_key), sigs in shows.items():
+        multi = any(distinct(a, b) for i, a in enumerate(sigs) for b in sigs[i + 1:])
+        dates = state['venues'].setdefault(vid, {})
+        dates[date_key] = dates.get(date_key, False) or multi
+    state['seen'].append(os.path.basename(path))
+    return used
+
+def venue_stats(state):
+    """{venue id: (multi dates, dates, confidence)}"""
+    out = {}
+    for vid, dates in state['venues'].items():
+        multi = sum(1 for m in dates.values() if m)
+        out[int(vid)] = (multi, len(dates), multi / float(len(dates)))
+    return out
+
+def selected(stats, min_dates, min_confidence):
+    return sorted(vid for vid, (multi, n, conf) in stats.items()
+                  if n >= min_dates and conf >= min_confidence)
+
+def retracted(stats, flagged, min_dates, min_confidence):
+    """Learner-set ids whose venue now has enough dates and too low a confidence."""
+    return sorted(vid for vid in flagged if vid in stats
+                  and stats[vid][1] >= min_dates and stats[vid][2] < min_confidence)
+
+def apply_flags(venues_path, ids, unset=()):
+    """Set <multiple>true</multiple> on every venue in ids and drop it from those in unset;
+    one atomic write. Returns (ids set, ids unset)."""
+    import xml.etree.ElementTree as ET
+    from bands_abbrev import atomic_write
+    tree = ET.parse(venues_path)
+    root = tree.getroot()
+    ids, unset = set(ids), set(unset)
+    changed, removed = [], []
+    for v in root.findall('venue'):
+        try:
+            vid = int(v.get('id'))
+        except (TypeError, ValueError):
+            continue
+        el = v.find('multiple')
+        if vid in unset:
+            if el is not None and (el.text or '').strip().lower() in TRUE_VALUES:
+                v.remove(el)
+                removed.append(vid)
+            continue
+        if vid not in ids:
+            continue
+        if el is None:
+            el = ET.SubElement(v, 'multiple')
+        if (el.text or '').strip().lower() not in TRUE_VALUES:
+            el.text = 'true'
+            changed.append(vid)
+    if changed or removed:
+        atomic_write(venues_path, "<?xml version='1.0' encoding='utf-8'?>\n" +
+                     ET.tostring(root, encoding='unicode') + '\n')
+    return changed, removed
+
+def learn_new(data_dir, resolver):
+    """Fold every livelist snapshot not seen before into the saved state; returns (state, n)."""
+    from history import snapshot_paths
+    path = os.path.join(data_dir, STATE_FILE)
+    state = load_state(path)
+    snaps = [p for p in snapshot_paths(data_dir) if os.path.basename(p).startswith('livelist-')]
+    present = set(os.path.basename(p) for p in snaps)
+    state['seen'] = [name for name in state['seen'] if name in present]
+    seen = set(state['seen'])
+    new = [p for p in snaps if os.path.basename(p) not in seen]
+    for snap in new:
+        learn_snapshot(state, snap, resolver)
+    if new:
+        save_state(path, state)
+    return state, len(new)
+
+def state_path(data_dir):
+    return os.path.join(data_dir, STATE_FILE)
+
+def qualifying(venues_path, state, min_dates=MIN_DATES, min_confidence=MIN_CONFIDENCE):
+    """[(id, pn)] of venues that pass the thresholds, are not flagged yet and were not retracted."""
+    from venue_resolver import load_venues
+    venues = dict((v['id'], v) for v in load_venues(venues_path))
+    retracted_ids = set(state.get('retracted', []))
+    return [(vid, venues[vid]['pn'])
+            for vid in selected(venue_stats(state), min_dates, min_confidence)
+            if vid in venues and not venues[vid]['multiple'] and vid not in retracted_ids]
+
+def apply_qualifying(venues_path, state, path, min_dates=MIN_DATES, min_confidence=MIN_CONFIDENCE):
+    """Flag the qualifying venues and unflag the learner's own flags that stopped
+    qualifying. Saves the learner-set ids to path; returns the ids whose flag changed."""
+    from venue_resolver import load_venues
+    found = qualifying(venues_path, state, min_dates, min_confidence)
+    flagged = set(state.get('flagged', []))
+    retract = retracted(venue_stats(state), flagged, min_dates, min_confidence)
+    if not found and not retract:
+        return []
+    names = dict((v['id'], v['pn']) for v in load_venues(venues_path))
+    changed, removed = apply_flags(venues_path, [vid for vid, _ in found], retract)
+    for vid in changed:
+        eprint("Marked {} as a multiple-shows venue.".format(names.get(vid, vid)))
+    for vid in removed:
+        eprint("Unmarked {}: no longer looks like a multiple-shows venue.".format(names.get(vid, vid)))
+    state['flagged'] = sorted((flagged | set(changed)) - set(retract))
+    save_state(path, state)
+    return sorted(changed + removed)
+
+def cmd_learn(args):
+    from venue_resolver import load_resolver
+    resolver = load_resolver(args.venues)
+    if resolver is None:
+        eprint("venues.xml not found at {}".format(args.venues)); return 2
+    state, n = learn_new(args.data_dir, resolver)
+    eprint("Learned from {} new snapshot(s).".format(n))
+    if args.apply:
+        apply_qualifying(args.venues, state, state_path(args.data_dir), args.min_dates, args.min_confidence)
+    return 0
+
+def cmd_suggest(args):
+    from venue_resolver import load_venues
+    state = load_state(state_path(args.data_dir))
+    venues = dict((v['id'], v) for v in load_venues(args.venues))
+    stats = venue_stats(state)
+    flagged = set(state.get('flagged', []))
+    gone = set(retracted(stats, flagged, args.min_dates, args.min_confidence))
+    rows = sorted(stats.items(), key=lambda kv: (-kv[1][2], -kv[1][1]))
+    print("  id  multi/dates  conf  flag  venue")
+    for vid, (multi, n, conf) in rows[:args.top]:
+        v = venues.get(vid, {'pn': '?', 'multiple': False})
+        if v['multiple']:
+            mark = 'OFF' if vid in gone else ('auto' if vid in flagged else 'yes')
+        else:
+            mark = 'NEW' if n >= args.min_dates and conf >= args.min_confidence else ''
+        print("{:4d}  {:5d}/{:<5d}  {:4.2f}  {:4s}  {}".format(vid, multi, n, conf, mark, v['pn']))
+    return 0
+
+def cmd_apply(args):
+    state = load_state(state_path(args.data_dir))
+    if args.dry_run:
+        for vid, pn in qualifying(args.venues, state, args.min_dates, args.min_confidence):
+            print("would flag {}: {}".format(vid, pn))
+        for vid in retracted(venue_stats(state), state.get('flagged', []), args.min_dates, args.min_confidence):
+            print("would unflag {}".format(vid))
+        return 0
+    apply_qualifying(args.venues, state, state_path(args.data_dir), args.min_dates, args.min_confidence)
+    return 0
+
+def cmd_retract(args):
+    path = state_path(args.data_dir)
+    state = load_state(path)
+    flagged = set(state.get('flagged', []))
+    ids = set(args.ids) if args.ids else set(flagged)
+    others = sorted(ids - flagged)
+    if others:
+        eprint("Not flagged by the learner (left alone): {}".format(' '.join(str(v) for v in others)))
+    _, removed = apply_flags(args.venues, [], ids & flagged)
+    state['flagged'] = sorted(flagged - ids)
+    state['retracted'] = sorted(set(state.get('retracted', [])) | (ids & flagged))
+    save_state(path, state)
+    eprint("Retracted {} flag(s); the learner will not set them again.".format(len(removed)))
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='multiple_learner.py')
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    ap.add_argument('--min-dates', type=int, default=MIN_DATES,
+                    help='show dates needed before a venue can be flagged')
+    ap.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE)
+    sub = ap.add_subparsers(dest='cmd')
+
+    l = sub.add_parser('learn', help='read snapshots not seen before')
+    l.add_argument('--apply', action='store_true', help='then flag the venues that qualify')
+    l.set_defaults(func=cmd_learn)
+
+    s = sub.add_parser('suggest', help='print per-venue confidence')
+    s.add_argument('--top', type=int, default=30)
+    s.set_defaults(func=cmd_suggest)
+
+    a = sub.add_parser('apply', help='flag the venues that qualify in venues.xml')
+    a.add_argument('--dry-run', action='store_true')
+    a.set_defaults(func=cmd_apply)
+
+    r = sub.add_parser('retract', help='take learner-set flags off venues.xml again')
+    r.add_argument('ids', nargs='*', type=int, help='venue ids (default: every learner-set flag)')
+    r.set_defaults(func=cmd_retract)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
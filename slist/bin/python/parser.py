@@ -58,7 +58,7 @@ def parse_additional_info(args):
     sys.stdout.write(" ".join(out))
 
 
-if __name__ == "__main__":
+def main():
     if len(sys.argv) < 3:
         sys.stderr.write("Usage: parser.py date MM/DD\n       parser.py info [symbols/text]\n")
         sys.exit(1)
@@ -77,3 +77,6 @@ if __name__ == "__main__":
         sys.stderr.write("Unknown mode. Use 'date' or 'info'.\n")
         sys.exit(1)
 
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+replay.py — record an interactive session once, replay it headlessly for timing.
+
+record runs a command (g.sh, wo.sh, main.sh, write_out.py, ...) in a
+pseudo-terminal, passes your keystrokes through, and saves them as a list
+of steps: the prompt line that was on screen and what was typed at it.
+Because the child's controlling terminal is the pty, prompts that
+duplicates.py writes to /dev/tty (get_tty_streams) are recorded the same
+way as read -p and input().
+
+The command runs with the cwd main.sh gives the flag scripts, bin/flags
+of the tree (--cwd picks another, relative to the tree; it is saved with
+the steps), and arguments naming files in the tree are passed as absolute
+paths into the tree actually used, so g.sh finds ../../data/venues.xml and
+f.sh its default ./../../data/mylist.txt.
+
+run copies the slist tree to a temp dir (with --fixture as its data dir),
+replays the steps in a pty as soon as each prompt appears, and reports:
+
+  latency    time from the previous keystrokes until the next prompt showed
+  total      spawn to exit
+  execs      programs started, counted through PATH shims
+  writes     files created / modified / deleted in the copied tree
+
+--save keeps the report as JSON; --baseline compares a run against a saved
+report and exits 1 when the total is more than --tolerance slower.
+
+Usage:
+  replay.py record g-one-event.json --fixture ../../fixtures/small -- bash bin/flags/g.sh
+  replay.py run g-one-event.json --fixture ../../fixtures/small --repeat 5
+  replay.py run wo.json --fixture F --baseline wo-report.json
+"""
+
+from __future__ import print_function
+import sys, os, re, json, time, shutil
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SHIMMED = ('python3', 'python', 'bash', 'sh', 'env', 'sed', 'awk', 'grep', 'sort', 'uniq',
+           'cut', 'tr', 'head', 'tail', 'wc', 'date', 'cat', 'cp', 'mv', 'rm', 'ls', 'stat',
+           'mktemp', 'mkdir', 'less', 'more', 'curl', 'tput', 'stty', 'xmllint', 'jq')
+ANSI_RE = re.compile(r'\x1b(\[[0-?]*[ -/]*[@-~]|\][^\x07]*\x07|[@-Z\\-_])')
+DEFAULT_CWD = os.path.join('bin', 'flags')   # where main.sh runs the flag scripts
+PROMPT_WIDTH = 60
+ROWS, COLS = 50, 200
+
+def eprint(*a, **k):
+    print(*a, file=sys.stderr, **k)
+
+def clean(data):
+    """Terminal output as plain text: escape sequences and carriage returns removed."""
+    return ANSI_RE.sub('', data.decode('utf-8', 'replace')).replace('\r', '')
+
+def prompt_line(text):
+    lines = [l.strip() for l in text.split('\n') if l.strip()]
+    return lines[-1][-PROMPT_WIDTH:] if lines else ''
+
+def echo_of(chunk):
+    """What the terminal echoes back for typed bytes."""
+    return chunk.replace(b'\x7f', b'\b \b').replace(b'\r', b'\r\n')
+
+def to_bytes(s):
+    return s.encode('utf-8', 'surrogateescape')
+
+def relative_args(cmd, root):
+    out = []
+    for a in cmd:
+        p = os.path.abspath(a) if os.path.exists(a) else None
+        out.append(os.path.relpath(p, root) if p and (p + os.sep).startswith(root + os.sep) else a)
+    return out
+
+def tree_args(cmd, tree):
+    """relative_args undone against tree: arguments naming a file in it become absolute."""
+    return [os.path.join(tree, a) if not os.path.isabs(a) and os.path.exists(os.path.join(tree, a)) else a
+            for a in cmd]
+
+def copy_tree(dest, fixture=None):
+    """The slist tree under dest, with fixture (a data dir) in place of data/."""
+    ignore = shutil.ignore_patterns('__pycache__', '*.pyc')
+    tree = os.path.join(dest, 'slist')
+    os.mkdir(tree)
+    for name in os.listdir(ROOT):
+        src = os.path.join(ROOT, name)
+        if name == 'data' and fixture:
+            src = fixture
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(tree, name), symlinks=True, ignore=ignore)
+        else:
+            shutil.copy2(src, os.path.join(tree, name))
+    if fixture and not os.path.exists(os.path.join(tree, 'data')):
+        shutil.copytree(fixture, os.path.join(tree, 'data'), ignore=ignore)
+    return tree
+
+def make_shims(dest, log):
+    """Wrappers that log their name and exec the real program; returns the shim dir."""
+    shim_dir = os.path.join(dest, 'shims')
+    os.mkdir(shim_dir)
+    for name in SHIMMED:
+        real = shutil.which(name)
+        if not real:
+            continue
+        path = os.path.join(shim_dir, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\necho {} >> "{}"\nexec "{}" "$@"\n'.format(name, log, real))
+        os.chmod(path, 0o755)
+    return shim_dir
+
+def tree_state(tree):
+    state = {}
+    for dirpath, dirnames, filenames in os.walk(tree):
+        dirnames[:] = [d for d in dirnames if d != '__pycache__']
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            state[os.path.relpath(path, tree)] = (st.st_size, st.st_mtime_ns)
+    return state
+
+def tree_writes(before, after):
+    writes = []
+    for path in sorted(set(before) | set(after)):
+        if path not in before:
+            writes.append((path, 'created'))
+        elif path not in after:
+            writes.append((path, 'deleted'))
+        elif before[path] != after[path]:
+            writes.append((path, 'modified'))
+    return writes
+
+def spawn(cmd, cwd, env):
+    import pty, fcntl, termios, struct
+    pid, fd = pty.fork()
+    if pid == 0:
+        try:
+            os.chdir(cwd)
+            os.execvpe(cmd[0], cmd, env)
+        except OSError as ex:
+            os.write(2, "replay: cannot run {}: {}\n".format(cmd[0], ex).encode('utf-8'))
+        os._exit(127)
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack('HHHH', ROWS, COLS, 0, 0))
+    return pid, fd
+
+def read_some(fd, timeout):
+    """Bytes from the pty, b'' on EOF, None on timeout."""
+    import select
+    r, _, _ = select.select([fd], [], [], max(timeout, 0))
+    if not r:
+        return None
+    try:
+        return os.read(fd, 65536)
+    except OSError:
+        return b''
+
+def exit_status(pid, wait):
+    deadline = time.time() + wait
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        if time.time() > deadline:
+            import signal
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return None
+        time.sleep(0.01)
+
+def parse_env(pairs):
+    env = {}
+    for pair in pairs or ():
+        k, sep, v = pair.partition('=')
+        if not sep:
+            raise SystemExit("--env wants KEY=VALUE, got {!r}".format(pair))
+        env[k] = v
+    return env
+
+# --- record ---
+def record_session(cmd, cwd, env):
+    """Run cmd on this terminal through a pty; return the recorded steps."""
+    import select, termios, tty
+    pid, fd = spawn(cmd, cwd, env)
+    saved = termios.tcgetattr(0) if os.isatty(0) else None
+    if saved:
+        tty.setraw(0)
+    steps, since, last = [], b'', b''
+    last_out = time.time()
+    try:
+        while True:
+            r, _, _ = select.select([fd, 0], [], [])
+            if fd in r:
+                data = read_some(fd, 0)
+                if not data:
+                    break
+                os.write(1, data)
+                since += data
+                last_out = time.time()
+            if 0 in r:
+                chunk = os.read(0, 1024)
+                if not chunk:
+                    break
+                echo = echo_of(last)
+                rest = since[len(echo):] if last and since.startswith(echo) else since
+                if not steps or clean(rest).strip():
+                    steps.append({'expect': prompt_line(clean(rest)), 'send': '',
+                                  'think': round(time.time() - last_out, 3)})
+                steps[-1]['send'] += chunk.decode('utf-8', 'surrogateescape')
+                os.write(fd, chunk)
+                since, last = b'', chunk
+    finally:
+        if saved:
+            termios.tcsetattr(0, termios.TCSADRAIN, saved)
+    status = exit_status(pid, 5)
+    os.close(fd)
+    return steps, status
+
+def cmd_record(args):
+    import tempfile
+    cmd = relative_args(args.command, ROOT)
+    if not cmd:
+        eprint("record: no command given (put it after --)"); return 2
+    tmp = tempfile.mkdtemp(prefix='replay-') if args.fixture else None
+    try:
+        tree = copy_tree(tmp, args.fixture) if tmp else ROOT
+        env = dict(os.environ)
+        env.update(parse_env(args.env))
+        eprint("Recording {} (exit the program to stop).".format(' '.join(cmd)))
+        steps, status = record_session(tree_args(cmd, tree), os.path.join(tree, args.cwd), env)
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+    script = {'version': 1, 'command': cmd, 'cwd': args.cwd, 'env': parse_env(args.env), 'steps': steps,
+              'recorded': time.strftime('%Y-%m-%d %H:%M')}
+    with open(args.script, 'w') as f:
+        json.dump(script, f, indent=1)
+    eprint("\nSaved {} step(s) to {} (exit {}).".format(len(steps), args.script, status))
+    return 0
+
+# --- run ---
+def replay_once(script, fixture, timeout, extra_env, keep=False):
+    import tempfile
+    from collections import Counter
+    tmp = tempfile.mkdtemp(prefix='replay-')
+    try:
+        tree = copy_tree(tmp, fixture)
+        log = os.path.join(tmp, 'exec.log')
+        open(log, 'w').close()
+        env = dict(os.environ)
+        env['PATH'] = make_shims(tmp, log) + os.pathsep + env.get('PATH', '')
+        env.update(script.get('env', {}))
+        env.update(extra_env)
+        before = tree_state(tree)
+
+        start = mark = time.time()
+        pid, fd = spawn(tree_args(script['command'], tree),
+                        os.path.join(tree, script.get('cwd', DEFAULT_CWD)), env)
+        steps, buf, eof = [], b'', False
+        for i, step in enumerate(script['steps']):
+            while step['expect'] not in clean(buf) and not eof:
+                data = read_some(fd, mark + timeout - time.time())
+                if data is None:
+                    break
+                eof = not data
+                buf += data
+            seen = step['expect'] in clean(buf)
+            steps.append({'step': i + 1, 'prompt': step['expect'],
+                          'latency': round(time.time() - mark, 4) if seen else None})
+            if not seen:
+                eprint("step {}: prompt never appeared: {!r}\n--- last output ---\n{}".format(
+                    i + 1, step['expect'], clean(buf)[-400:]))
+                break
+            os.write(fd, to_bytes(step['send']))
+            mark, buf = time.time(), b''
+        while not eof:
+            data = read_some(fd, mark + timeout - time.time())
+            if data is None:
+                break
+            eof = not data
+            buf += data
+        status = exit_status(pid, timeout if eof else 0)
+        total = time.time() - start
+        os.close(fd)
+
+        with open(log, 'r') as f:
+            execs = Counter(l.strip() for l in f if l.strip())
+        return {'command': script['command'], 'exit': status, 'total': round(total, 4),
+                'completed': len(steps) == len(script['steps']) and steps[-1]['latency'] is not None
+                             if steps else True,
+                'steps': steps, 'execs': dict(execs),
+                'writes': [{'path': p, 'change': c} for p, c in tree_writes(before, tree_state(tree))],
+                'tree': tree if keep else None}
+    finally:
+        if not keep:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+def median(values):
+    values = sorted(values)
+    n = len(values)
+    return values[n // 2] if n % 2 else (values[n // 2 - 1] + values[n // 2]) / 2.0
+
+def combine(runs):
+    """One report from several runs: median total and per-step latency."""
+    report = dict(runs[-1])
+    report['runs'] = len(runs)
+    report['total'] = round(median([r['total'] for r in runs]), 4)
+    for i, step in enumerate(report['steps']):
+        lat = [r['steps'][i]['latency'] for r in runs
+               if i < len(r['steps']) and r['steps'][i]['latency'] is not None]
+        step['latency'] = round(median(lat), 4) if lat else None
+    return report
+
+def ms(seconds):
+    return '     -' if seconds is None else '{:6.0f}'.format(seconds * 1000)
+
+def print_report(report, baseline=None):
+    base_steps = dict((s['step'], s) for s in (baseline or {}).get('steps', []))
+    print("{}: exit {}, {} step(s), total {:.3f}s{}".format(
+        ' '.join(report['command']), report['exit'], len(report['steps']), report['total'],
+        ' (median of {})'.format(report['runs']) if report.get('runs', 1) > 1 else ''))
+    print("  step      ms{}  prompt".format('    base' if baseline else ''))
+    for s in report['steps']:
+        base = ms(base_steps[s['step']]['latency']) + '  ' if s['step'] in base_steps else ''
+        if baseline and not base:
+            base = '     -  '
+        print("  {:4d}  {}  {}{}".format(s['step'], ms(s['latency']), base, s['prompt']))
+    execs = report['execs']
+    print("  execs: {}  ({})".format(sum(execs.values()), ', '.join(
+        '{} {}'.format(name, n) for name, n in sorted(execs.items(), key=lambda kv: -kv[1]))))
+    print("  writes: {}".format(len(report['writes'])))
+    for w in report['writes']:
+        print("    {:9s} {}".format(w['change'], w['path']))
+    if baseline:
+        print("  total vs baseline: {:.3f}s -> {:.3f}s ({:+.0f}%)".format(
+            baseline['total'], report['total'],
+            100.0 * (report['total'] - baseline['total']) / max(baseline['total'], 1e-9)))
+
+def cmd_run(args):
+    with open(args.script, 'r') as f:
+        script = json.load(f)
+    extra = parse_env(args.env)
+    runs = []
+    for n in range(args.repeat):
+        runs.append(replay_once(script, args.fixture, args.timeout, extra,
+                                keep=args.keep and n == args.repeat - 1))
+        if not runs[-1]['completed']:
+            break
+    report = combine(runs)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    if args.json:
+        print(json.dumps(report, indent=1))
+    else:
+        print_report(report, baseline)
+        if report['tree']:
+            print("  tree kept at " + report['tree'])
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=1)
+    if not report['completed']:
+        return 1
+    if baseline and report['total'] > baseline['total'] * (1 + args.tolerance):
+        eprint("Slower than baseline by more than {:.0f}%.".format(args.tolerance * 100))
+        return 1
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='replay.py')
+    sub = ap.add_subparsers(dest='cmd')
+
+    r = sub.add_parser('record', usage='%(prog)s SCRIPT [--fixture DIR] [--cwd DIR] [--env K=V] -- COMMAND...',
+                       help='run a command in a pty and save the keystrokes')
+    r.add_argument('script', help='session file to write')
+    r.add_argument('--fixture', help='data dir to record against (default: the real data)')
+    r.add_argument('--cwd', default=DEFAULT_CWD,
+                   help='working dir, relative to the tree (default: %(default)s, as main.sh)')
+    r.add_argument('--env', action='append', metavar='KEY=VALUE', help='saved with the session')
+    r.set_defaults(func=cmd_record)
+
+    p = sub.add_parser('run', help='replay a session headlessly and report timings')
+    p.add_argument('script')
+    p.add_argument('--fixture', help='data dir to copy in place of data/ (default: the real data)')
+    p.add_argument('--env', action='append', metavar='KEY=VALUE')
+    p.add_argument('--timeout', type=float, default=30.0, help='seconds to wait for each prompt')
+    p.add_argument('--repeat', type=int, default=1, help='report medians over N runs')
+    p.add_argument('--json', action='store_true')
+    p.add_argument('--save', metavar='FILE', help='write the report as JSON')
+    p.add_argument('--baseline', metavar='FILE', help='saved report to compare against')
+    p.add_argument('--tolerance', type=float, default=0.25)
+    p.add_argument('--keep', action='store_true', help='keep the temp tree of the last run')
+    p.set_defaults(func=cmd_run)
+
+    argv = sys.argv[1:]
+    command = []
+    if '--' in argv:
+        argv, command = argv[:argv.index('--')], argv[argv.index('--') + 1:]
+    args = ap.parse_args(argv)
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    args.command = command
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+review_journal.py — append-only log of review decisions.
+
+duplicates.py (y/n/e/u/m on a possible dupe) and write_out.py
+(keep/edit/delete on needs_review.txt) append every decision the moment it
+is made, keyed by the listing's hash (plus the live match for dupes).
+Rerunning after a Ctrl-C replays those decisions instead of prompting.
+Review decisions only serve that resume: they are cleared once the
+write-out completes. A dupe decision is kept and reused on a later
+write-out whenever the same listing meets the same live match again.
+
+One JSON object per line:
+  {"scope": "dupes", "listing": "<hash>", "live": "<hash,...>",
+   "choice": "e", "text": "<edited listing>", "at": "2026-10-19T15:20:00"}
+
+Usage:
+  review_journal.py show [--scope dupes]
+  review_journal.py prune --days 60
+"""
+
+from __future__ import print_function
+import sys, os, json, datetime as dt
+
+from duplicates import eprint, normalize_text, parse_block, listing_hash
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+JOURNAL_FILE = 'review_journal.jsonl'
+
+def block_key(lines):
+    """Listing hash of a block; plain text hash if it has no date header."""
+    rec = parse_block(list(lines))
+    if rec:
+        return listing_hash(rec)
+    import hashlib
+    text = normalize_text(' '.join(lines))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+class Journal(object):
+    """Decisions by (scope, listing, live); the newest entry for a key wins."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for n, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        eprint("Warning: skipping bad journal line {} in {}".format(n, path))
+                        continue
+                    self.entries[self._key(rec['scope'], rec['listing'], rec.get('live'))] = rec
+
+    @staticmethod
+    def _key(scope, listing, live):
+        return (scope, listing, live or '')
+
+    def get(self, scope, listing, live=None):
+        return self.entries.get(self._key(scope, listing, live))
+
+    def record(self, scope, listing, choice, live=None, text=None):
+        rec = {'scope': scope, 'listing': listing, 'live': live or '', 'choice': choice,
+               'at': dt.datetime.now().replace(microsecond=0).isoformat()}
+        if text is not None:
+            rec['text'] = text
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(rec, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[self._key(scope, listing, live)] = rec
+        return rec
+
+    def rewrite(self, keep):
+        """Atomically rewrite the journal with the entries for which keep(rec) is true."""
+        from bands_abbrev import atomic_write
+        recs = [r for r in self.entries.values() if keep(r)]
+        recs.sort(key=lambda r: r['at'])
+        atomic_write(self.path, ''.join(json.dumps(r, sort_keys=True) + "\n" for r in recs))
+        self.entries = dict((self._key(r['scope'], r['listing'], r.get('live')), r) for r in recs)
+        return len(recs)
+
+    def clear(self, scope):
+        """Drop every decision in scope, e.g. 'review' once its write-out has finished."""
+        if any(key[0] == scope for key in self.entries):
+            self.rewrite(lambda r: r['scope'] != scope)
+
+def cmd_show(args):
+    j = Journal(args.journal)
+    for rec in sorted(j.entries.values(), key=lambda r: r['at']):
+        if args.scope and rec['scope'] != args.scope:
+            continue
+        print("{at}  {scope:6s} {listing}  {choice}".format(**rec))
+    return 0
+
+def cmd_prune(args):
+    j = Journal(args.journal)
+    cutoff = (dt.datetime.now() - dt.timedelta(days=args.days)).isoformat()
+    before = len(j.entries)
+    after = j.rewrite(lambda r: r['at'] >= cutoff)
+    eprint("Pruned {} of {} decisions older than {} days.".format(before - after, before, args.days))
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='review_journal.py')
+    ap.add_argument('--journal', default=os.path.join(DATA_DIR, JOURNAL_FILE))
+    sub = ap.add_subparsers(dest='cmd')
+
+    s = sub.add_parser('show', help='list recorded decisions')
+    s.add_argument('--scope', choices=('dupes', 'review'))
+    s.set_defaults(func=cmd_show)
+
+    p = sub.add_parser('prune', help='drop decisions older than N days')
+    p.add_argument('--days', type=int, default=60)
+    p.set_defaults(func=cmd_prune)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+runner.py — run a chain of main.sh flags in one Python process.
+
+main.sh hands chains made only of p / s / f / wo to this runner (same
+argv: `runner.py p s`, `runner.py wo f`, `runner.py -p out.txt -s`), and
+wo.sh is a wrapper around `runner.py wo`, so stage_wo is the only
+write-out implementation.
+Every stage works on one Session, which loads the live list, venue index,
+mylist and needs_review on first use and keeps them in memory
+for the stages after it. Files are written once, when the chain ends,
+followed by anything a stage queued for after the flush (archive, paging).
+
+Set MSM_NO_RUNNER=1 to make main.sh fall back to one script per flag.
+"""
+
+from __future__ import print_function
+import sys, os, re, shutil
+
+from duplicates import eprint
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+FLAGS = ('p', 's', 'f', 'wo')
+INDENT = '       '   # second-line indentation (7 spaces)
+ARCHIVES_KEPT = 5
+
+def normalize_flag(tok):
+    f = tok[1:] if tok.startswith('-') else tok
+    f = f[1:] if f.startswith('-') else f
+    return f if f in FLAGS else None
+
+def parse_chain(argv):
+    """[(flag, [args...]), ...] — the same grouping main.sh does."""
+    chain = []
+    for tok in argv:
+        flag = normalize_flag(tok)
+        if flag:
+            chain.append((flag, []))
+        elif not chain:
+            raise ValueError("argument '{}' appears before any flag".format(tok))
+        else:
+            chain[-1][1].append(tok)
+    return chain
+
+def write_records(path, records):
+    from bands_abbrev import atomic_write
+    atomic_write(path, ''.join(l1 + '\n' + l2 + '\n' for l1, l2 in records))
+
+def block_record(block):
+    """(l1, l2) of a block from the dupe check; an 'e' edit comes back as one
+    line and is split at ' at ' as duplicates.main does."""
+    lines = block.splitlines()
+    if len(lines) >= 2:
+        return (lines[0], lines[1])
+    head, sep, venue = block.partition(' at ')
+    if sep:
+        return (head.strip(), INDENT + 'at ' + venue.strip())
+    return (block, '')
+
+def read_records(path):
+    from filter_future_only import group_blocks
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        blocks = group_blocks([l.rstrip('\n') for l in f])
+    return [(b[0], b[1] if len(b) > 1 else '') for b in blocks]
+
+def page(text):
+    if sys.stdout.isatty() and shutil.which('less'):
+        import subprocess
+        p = subprocess.Popen(['less', '-R', '-K'], stdin=subprocess.PIPE, universal_newlines=True)
+        try:
+            p.communicate(text)
+        except KeyboardInterrupt:
+            p.wait()
+    else:
+        sys.stdout.write(text)
+
+class Session(object):
+    """Artifacts shared between stages; loaded lazily, flushed once."""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.venues_path = os.path.join(data_dir, 'venues.xml')
+        self.mylist_path = os.path.join(data_dir, 'mylist.txt')
+        self.needs_path = os.path.join(data_dir, 'needs_review.txt')
+        self.shards_dir = os.path.join(data_dir, 'shards')
+        self._cache = {}
+        self._files = {}      # path -> records, for files loaded through records()
+        self._dirty = set()
+        self.after_flush = []
+
+    def _get(self, name, load):
+        if name not in self._cache:
+            self._cache[name] = load()
+        return self._cache[name]
+
+    # --- shared artifacts ---
+    @property
+    def resolver(self):
+        from venue_resolver import load_resolver
+        return self._get('resolver', lambda: load_resolver(self.venues_path))
+
+    @property
+    def venues_map(self):
+        from duplicates import load_venues_dict
+        return self._get('venues_map', lambda: load_venues_dict(self.venues_path))
+
+    def _load_live(self, url=None):
+        from live_index import find_live_cache, stream_live_list, LIVE_URL
+        from live_stream import clean_live_text
+        from duplicates import LazyLiveList
+        path = None if url else find_live_cache(self.data_dir)
+        if path is None:
+            eprint("Fetching live list from {} …".format(url or LIVE_URL))
+            entries = stream_live_list(url or LIVE_URL, self.data_dir, self.resolver)
+            path = find_live_cache(self.data_dir)
+        else:
+            entries = None
+        with open(path, 'r') as f:
+            text = clean_live_text(f.read())
+        if entries is None:
+            entries = LazyLiveList(text, self.resolver)
+        return {'path': path, 'text': text, 'entries': entries}
+
+    def live(self, url=None):
+        if url:
+            self._cache['live'] = self._load_live(url)
+        return self._get('live', self._load_live)
+
+    def records(self, path):
+        if path not in self._files:
+            self._files[path] = read_records(path)
+        return self._files[path]
+
+    def set_records(self, path, records):
+        self._files[path] = list(records)
+        self._dirty.add(path)
+
+    def flush(self):
+        for path in sorted(self._dirty):
+            write_records(path, self._files[path])
+        self._dirty.clear()
+        for action in self.after_flush:
+            action()
+        self.after_flush = []
+
+# --- stages ---
+MONTH_NUM = dict((m, i) for i, m in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1))
+
+def sort_key(record):
+    """MMDD key exactly like f.sh (month abbr + day of the first line)."""
+    parts = record[0].split()
+    try:
+        return (MONTH_NUM[parts[0].lower()], int(parts[1]))
+    except (IndexError, KeyError, ValueError):
+        return (0, 0)
+
+def refresh_shards(session):
+    """Fold mylist.txt's edits since the last merge into the shards, then rewrite it as their merge."""
+    from shards import Regions, refresh
+    removed, added = refresh(session.shards_dir, session.mylist_path,
+                             Regions(session.venues_path, os.path.join(session.data_dir, 'vencolor.json')))
+    if removed or added:
+        print("Shards: {} listing(s) removed, {} inserted.".format(removed, added))
+    session._files.pop(session.mylist_path, None)
+
+def stage_f(session, args):
+    if not args and os.path.isdir(session.shards_dir):
+        if session.mylist_path in session._dirty:
+            # an earlier stage changed mylist: merge once it has been written
+            session.after_flush.append(lambda: refresh_shards(session))
+        else:
+            refresh_shards(session)
+        print("✓ Merged region shards into {}".format(session.mylist_path))
+        return
+    path = os.path.abspath(args[0]) if args else session.mylist_path
+    session.set_records(path, sorted(session.records(path), key=sort_key))
+    print("✓ Sorted listings in {}".format(path))
+
+def stage_p(session, args):
+    if args and args[0] == '-s':
+        return stage_s(session, args[1:])
+    if args and re.match(r'^https?://', args[0]):
+        page(session.live(args[0])['text'])
+    elif args and os.path.isfile(args[0]):
+        with open(args[0], 'r') as f:
+            page(f.read())
+    else:
+        live = session.live()
+        eprint("Using live list {}".format(os.path.basename(live['path'])))
+        page(live['text'])
+
+def stage_s(session, args):
+    term = ' '.join(args) if args else input("Search for: ")
+    if not term:
+        return
+    lines = session.live()['text'].splitlines()
+    pat = re.compile(re.escape(term), re.IGNORECASE)
+    out, last = [], -2
+    for i, line in enumerate(lines):
+        if not pat.search(line):
+            continue
+        lo, hi = max(0, i - 1), min(len(lines), i + 2)
+        if lo > last + 1 and out:
+            out.append('--')
+        for j in range(max(lo, last + 1), hi):
+            out.append('{}{}{}'.format(j + 1, ':' if j == i else '-', lines[j]))
+        last = hi - 1
+    page('\n'.join(out) + '\n' if out else "No matches for '{}'.\n".format(term))
+
+def source_lines(path):
+    """{(l1, l2): (line of l1, line of l2)} for the records as read from path (1-based)."""
+    out, pending = {}, []
+    if not os.path.exists(path):
+        return out
+    with open(path, 'r') as f:
+        for n, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            pending.append((n, line))
+            if len(pending) == 2:
+                out.setdefault((pending[0][1], pending[1][1]), (pending[0][0], pending[1][0]))
+                pending = []
+    if pending:
+        out.setdefault((pending[0][1], ''), (pending[0][0], pending[0][0]))
+    return out
+
+def lint_records(session, path, records, today):
+    """lint.lint_lines over in-memory records: (fixed records, flagged headers).
+
+    Findings point at the record's line in path as it was read; records
+    that are not in the file (yet) are reported without a line."""
+    from lint import lint_lines, flagged_headers, FIXABLE
+    lines = [l for rec in records for l in rec]
+    findings, fixed = lint_lines(path, lines, session.resolver, today)
+    where = None
+    for f in findings:
+        if f['severity'] == FIXABLE:
+            continue
+        if where is None:
+            where = source_lines(path)
+        i = f['line'] - 1
+        at = where.get(records[i // 2]) if i // 2 < len(records) else None
+        loc = "{}:{}".format(path, at[i % 2]) if at else path
+        print("{}: {severity}: {code}: {message}".format(loc, **f))
+    return list(zip(fixed[0::2], fixed[1::2])), flagged_headers(findings, fixed)
+
+def review_needs(records, journal_path, flagged=None):
+    """Keep/edit/drop each needs_review record (journaled like write_out.py).
+
+    With flagged (a set of header lines), records not in it are kept unasked.
+    """
+    from write_out import prompt_edit
+    from review_journal import Journal, block_key
+    journal = Journal(journal_path)
+    kept = []
+    for l1, l2 in records:
+        if flagged is not None and l1 not in flagged:
+            print("Kept (no lint findings): {}".format(l1))
+            kept.append((l1, l2))
+            continue
+        key = block_key([l1, l2])
+        past = journal.get('review', key)
+        if past is not None:
+            choice = past['choice']
+            if choice == 'e' and past.get('text'):
+                l1, _, l2 = past['text'].partition('\n')
+        else:
+            print("\n----- Listing -----\n{}\n{}\n-------------------".format(l1, l2))
+            choice = (input("Choose (K/e/d): ").strip().lower() or 'k')
+            if choice == 'e':
+                l1 = prompt_edit('Edit line 1: ', l1)
+                l2 = INDENT + prompt_edit('Edit line 2: ', l2).lstrip()
+            journal.record('review', key, choice, text=l1 + '\n' + l2 if choice == 'e' else None)
+        if choice == 'd':
+            print("Dropped.")
+            continue
+        kept.append((l1, l2))
+    return kept
+
+def stage_wo(session, args):
+    import datetime as dt
+    from filter_future_only import future_blocks
+    from duplicates import (parse_mylist, interactive_filter, unparsed_blocks, load_rules, RULES_FILE,
+                            save_partial)
+    from ledger import Ledger, LEDGER_FILE
+    from review_journal import Journal, JOURNAL_FILE
+
+    journal_path = os.path.join(session.data_dir, JOURNAL_FILE)
+    print("=== Starting write-out process ===")
+    today = dt.date.today()
+    # 0) Load the live list in the background while needs_review is reviewed
+    import threading
+    prefetch = {}
+    def load_live():
+        try:
+            session.live()
+        except Exception as ex:
+            prefetch['error'] = ex
+    loader = threading.Thread(target=load_live)
+    loader.daemon = True
+    loader.start()
+
+    # Region shards: mylist is their merge (absorbing its own edits first);
+    # the write-out's changes are merged back the same way after the flush
+    sharded = os.path.isdir(session.shards_dir)
+    if sharded and session.mylist_path not in session._dirty:
+        refresh_shards(session)
+
+    # 1) Filter past shows from both files
+    needs = [(b[0], b[1] if len(b) > 1 else '') for b in future_blocks(session.records(session.needs_path), today)]
+    mine = [(b[0], b[1] if len(b) > 1 else '') for b in future_blocks(session.records(session.mylist_path), today)]
+
+    # 1.5) Lint both lists: fix the safe problems, flag the rest
+    print("Checking listings...")
+    needs, flagged = lint_records(session, session.needs_path, needs, today)
+    mine, _ = lint_records(session, session.mylist_path, mine, today)
+
+    # 2) Interactive review of needs_review, merged into mylist
+    #    (WO_REVIEW=flagged: only stop on the listings lint flagged)
+    if needs:
+        print("Processing items in needs_review.txt ...")
+        only = flagged if os.environ.get('WO_REVIEW', 'all') == 'flagged' else None
+        mine += review_needs(needs, journal_path, only)
+    else:
+        print("No items in needs_review.txt.")
+    session.set_records(session.needs_path, [])
+
+    # 2.5) Remove exact duplicate 2-line blocks
+    seen, unique = set(), []
+    for rec in mine:
+        if rec not in seen:
+            seen.add(rec); unique.append(rec)
+    mine = unique
+
+    # 3) Duplicate check against the live list
+    if mine:
+        print("Running duplicate check...")
+        if loader.is_alive():
+            print("Waiting for the live list...")
+        loader.join()
+        live = session.live() if 'error' not in prefetch else None
+        if live is None:
+            eprint("Warning: live list unavailable ({}); skipping duplicate pass.".format(prefetch['error']))
+        if live is not None:
+            my_text = '\n'.join(l1 + '\n' + l2 for l1, l2 in mine)
+            my_entries = parse_mylist(my_text, session.resolver)
+            # Unparseable and already-submitted records skip the dupe check
+            keep = unparsed_blocks(my_text, my_entries)
+            new, changed, submitted = Ledger(os.path.join(session.data_dir, LEDGER_FILE)).partition(my_entries)
+            print("Ledger: {} new, {} changed, {} already submitted.".format(
+                len(new), len(changed), len(submitted)))
+            rules = load_rules(os.path.join(session.data_dir, RULES_FILE))
+            learn_multiple(session)
+            journal = Journal(journal_path)
+            progress = {'out': [], 'done': 0}
+            checked = new + changed
+            try:
+                blocks = keep + [e['full_text'] for e in submitted] + interactive_filter(
+                    checked, live['entries'], session.venues_map, session.venues_path, False,
+                    journal=journal, progress=progress, rules=rules)
+            except KeyboardInterrupt:
+                save_partial(keep + [e['full_text'] for e in submitted] + progress['out'] +
+                             [e['full_text'] for e in checked[progress['done']:]], journal)
+                raise
+            mine = [block_record(b) for b in blocks]
+    else:
+        print("mylist.txt is empty; skipping duplicate pass.")
+
+    # 4) Sort final list
+    if sharded:
+        session.after_flush.append(lambda: refresh_shards(session))
+    session.set_records(session.mylist_path, sorted(mine, key=sort_key))
+    session.after_flush.append(lambda: archive_and_show(session))
+    # needs_review is written out: its decisions were only kept for a resume
+    session.after_flush.append(lambda: Journal(journal_path).clear('review'))
+
+def learn_multiple(session):
+    """Let multiple_learner flag venues from the live snapshots before the dupe check."""
+    try:
+        from multiple_learner import learn_new, apply_qualifying, state_path
+        state, _ = learn_new(session.data_dir, session.resolver)
+        if apply_qualifying(session.venues_path, state, state_path(session.data_dir)):
+            session._cache.pop('venues_map', None)
+    except Exception as ex:
+        eprint("Warning: could not update multiple-shows flags: " + str(ex))
+
+def archive_and_show(session):
+    import glob, time
+    archive = os.path.join(session.data_dir, 'mylist-{}.txt'.format(time.strftime('%Y%m%d')))
+    shutil.copy(session.mylist_path, archive)
+    print("Archived to {}".format(os.path.basename(archive)))
+    archives = sorted(glob.glob(os.path.join(session.data_dir, 'mylist-*.txt')),
+                      key=os.path.getmtime, reverse=True)
+    for old in archives[ARCHIVES_KEPT:]:
+        os.remove(old)
+    try:
+        from aggregates import load_state, save_state, record_snapshot, STATE_FILE
+        state_path = os.path.join(session.data_dir, STATE_FILE)
+        state = load_state(state_path)
+        if 'live' in session._cache:
+            record_snapshot(state, session.live()['path'], session.resolver, 'live')
+        record_snapshot(state, archive, session.resolver, 'mylist')
+        save_state(state_path, state)
+    except Exception as ex:
+        eprint("Warning: could not update aggregates: " + str(ex))
+    from duplicates import parse_mylist
+    from ledger import Ledger, LEDGER_FILE
+    ledger = Ledger(os.path.join(session.data_dir, LEDGER_FILE))
+    with open(archive, 'r') as f:
+        ledger.record(parse_mylist(f.read(), session.resolver))
+    ledger.save()
+    with open(archive, 'r') as f:
+        page("===== FINAL SHOW LIST =====\n" + f.read() + "===========================\n")
+
+STAGES = {'p': stage_p, 's': stage_s, 'f': stage_f, 'wo': stage_wo}
+
+def main():
+    try:
+        chain = parse_chain(sys.argv[1:])
+    except ValueError as ex:
+        eprint("Error: " + str(ex)); return 1
+    if not chain:
+        eprint("usage: runner.py <flag> [args...] [<flag> [args...]] ...  (flags: {})".format(
+            ', '.join(FLAGS)))
+        return 2
+    session = Session()
+    try:
+        for flag, args in chain:
+            print("→ Running {}{}".format(flag, (' -- ' + ' '.join(args)) if args else ''))
+            STAGES[flag](session, args)
+    except KeyboardInterrupt:
+        eprint("\nInterrupted; mylist.txt and needs_review.txt left unchanged.")
+        if any(flag == 'wo' for flag, _ in chain):
+            eprint("Review decisions so far are journaled; rerun wo to pick up where you left off.")
+        return 130
+    session.flush()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
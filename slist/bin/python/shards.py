@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+shards.py — mylist split by venue region, merged for the final list.
+
+When data/shards/ exists, listings live in one file per region color
+(the venue's <color> in venues.xml, else the vencolor.json location
+match on the second line; other.txt when neither gives one color):
+
+  shards/green.txt  shards/blue.txt  shards/red.txt ...
+
+Each shard is kept sorted by (date, start time) as listings are inserted,
+so editors adding SF and East Bay shows write different files. mylist.txt
+becomes the output of a streaming k-way merge of the sorted shards
+(heapq.merge), one pass however many shards or listings there are.
+
+g.sh adds saved listings with `add`. `merge --out mylist.txt` never just
+overwrites the file: each merge leaves a copy in shards/.merged.txt, and
+the next one first diffs mylist.txt against it and syncs the difference
+into the shards (listings dropped or edited there are removed, new ones
+inserted), so whatever was written straight to mylist.txt -- a g.sh
+fallback save, write_out.py, a hand edit -- is kept. The write-out works
+the same way: it merges, runs its review and dupe check, and merges again
+after writing, which folds its changes in while keeping shows other
+editors added meanwhile.
+
+Usage:
+  shards.py init                        # create shards/ from mylist.txt
+  printf '...\\n...\\n' | shards.py add  # insert listings from stdin
+  shards.py merge [--out ../../data/mylist.txt]   # --out: absorb its edits first
+  shards.py sync --base before.txt after.txt
+  shards.py stats
+"""
+
+from __future__ import print_function
+import sys, os, re, glob, json, heapq, shutil, contextlib, datetime as dt
+from bisect import bisect_right
+from collections import Counter
+
+from duplicates import (eprint, DATE_HEADER_RE, MONTHS, year_for_next_occurrence,
+                        extract_first_time_minutes, parse_block)
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+SHARDS_DIR = os.path.join(DATA_DIR, 'shards')
+OTHER = 'other'
+MERGED_FILE = '.merged.txt'   # the list as last merged, to diff mylist.txt against
+NO_TIME = 24 * 60   # listings without a start time sort last in their day
+
+def block_key(l1, l2, today=None):
+    """(date ordinal, start minutes) of a two-line listing; (0, 0) if it has no date."""
+    m = DATE_HEADER_RE.match(l1.strip().lower())
+    if not m:
+        return (0, 0)
+    mon, day = MONTHS.index(m.group('mon')) + 1, int(m.group('day'))
+    try:
+        ordinal = dt.date(year_for_next_occurrence(mon, day, today), mon, day).toordinal()
+    except ValueError:
+        return (0, 0)
+    t = extract_first_time_minutes(l1 + ' ' + l2)
+    return (ordinal, NO_TIME if t is None else t)
+
+def read_records(path):
+    """Two-line (l1, l2) records of a list file, streamed; blank lines skipped."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        pending = []
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            pending.append(line)
+            if len(pending) == 2:
+                yield (pending[0], pending[1])
+                pending = []
+        if pending:
+            yield (pending[0], '')
+
+def keyed(records, today=None):
+    for l1, l2 in records:
+        yield (block_key(l1, l2, today), l1, l2)
+
+def write_records(path, records):
+    """Stream records into a temp file next to path, then replace it (like atomic_write)."""
+    import tempfile
+    from bands_abbrev import keep_mode
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_shard_", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w") as f:
+            for l1, l2 in records:
+                f.write(l1 + '\n' + l2 + '\n')
+        keep_mode(path, tmp)
+        os.replace(tmp, path)
+    except Exception:
+        try: os.remove(tmp)
+        except Exception: pass
+        raise
+
+def shard_paths(shards_dir):
+    return sorted(glob.glob(os.path.join(shards_dir, '*.txt')))
+
+@contextlib.contextmanager
+def shard_lock(path):
+    """Exclusive lock for one shard's read-modify-write."""
+    import fcntl
+    lock = os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.lock')
+    with open(lock, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+class Regions(object):
+    """Which shard a listing belongs to: its venue's color, else a location match."""
+
+    def __init__(self, venues_path, colors_path):
+        from venue_resolver import load_resolver
+        self.resolver = load_resolver(venues_path)
+        self.locs = []
+        if colors_path and os.path.exists(colors_path):
+            with open(colors_path, 'r') as f:
+                for m in json.load(f):
+                    self.locs += [(loc.lower(), m['color']) for loc in m.get('loc', [])]
+
+    def shard_for(self, l1, l2):
+        rec = parse_block([l1, l2], self.resolver)
+        if rec and rec['venue_id'] is not None:
+            color = self.resolver.venues[rec['venue_id']]['color']
+            if color:
+                return self.name(color)
+        text = l2.lower()
+        hits = set(color for loc, color in self.locs if loc in text)
+        return self.name(hits.pop()) if len(hits) == 1 else OTHER
+
+    @staticmethod
+    def name(color):
+        return re.sub(r'[^a-z0-9_-]+', '-', color.strip().lower()) or OTHER
+
+def insert(shards_dir, records, regions, today=None):
+    """Insert records at their sorted position in their shards; returns {shard: count}."""
+    by_shard = {}
+    for l1, l2 in records:
+        by_shard.setdefault(regions.shard_for(l1, l2), []).append((l1, l2))
+    for name, recs in by_shard.items():
+        path = os.path.join(shards_dir, name + '.txt')
+        with shard_lock(path):
+            current = list(keyed(read_records(path), today))
+            keys = [k for k, _, _ in current]
+            for l1, l2 in recs:
+                k = block_key(l1, l2, today)
+                i = bisect_right(keys, k)   # after equal keys: insertion order is kept
+                keys.insert(i, k)
+                current.insert(i, (k, l1, l2))
+            write_records(path, [(l1, l2) for _, l1, l2 in current])
+    return dict((name, len(recs)) for name, recs in by_shard.items())
+
+def remove(shards_dir, records):
+    """Drop records (exact (l1, l2) matches) from the shards, one copy per time a record
+    is listed, so duplicate copies are not all removed; returns how many went."""
+    gone = Counter(records)
+    n = 0
+    for path in shard_paths(shards_dir):
+        if not +gone:
+            break
+        with shard_lock(path):
+            current = list(read_records(path))
+            kept = []
+            for r in current:
+                if gone[r] > 0:
+                    gone[r] -= 1
+                else:
+                    kept.append(r)
+            if len(kept) != len(current):
+                write_records(path, kept)
+                n += len(current) - len(kept)
+    return n
+
+def merged(shards_dir, today=None):
+    """All shards' records in (date, time) order: a streaming k-way merge."""
+    streams = [keyed(read_records(p), today) for p in shard_paths(shards_dir)]
+    for _, l1, l2 in heapq.merge(*streams, key=lambda r: r[0]):
+        yield (l1, l2)
+
+def beyond(records, counts):
+    """records, in order, past the first counts[r] copies of each (a multiset difference)."""
+    left = Counter(counts)
+    for r in records:
+        if left[r] > 0:
+            left[r] -= 1
+        else:
+            yield r
+
+def sync(shards_dir, base, final, regions, today=None):
+    """Apply the edits that turned list base into list final to the shards.
+
+    Lists are compared as multisets: a listing in final twice as often as
+    in base gets one more copy, one that lost a copy loses just that one."""
+    removed = remove(shards_dir, list(beyond(base, Counter(final))))
+    added = insert(shards_dir, list(beyond(final, Counter(base))), regions, today)
+    return removed, sum(added.values())
+
+def absorb(shards_dir, path, regions, today=None):
+    """Sync the edits made to path since the last merge into the shards.
+
+    Without a last merge to diff against, only listings missing from the
+    shards are added. Returns (removed, inserted)."""
+    current = list(read_records(path))
+    base_path = os.path.join(shards_dir, MERGED_FILE)
+    base = list(read_records(base_path)) if os.path.exists(base_path) else []
+    base_counts = Counter(base)
+    saved = Counter(merged(shards_dir, today)) - base_counts
+    final, seen = [], Counter()
+    for r in current:
+        seen[r] += 1
+        # copies already in a shard (saved there and to path too) are not inserted twice
+        if base_counts[r] < seen[r] <= base_counts[r] + saved[r]:
+            continue
+        final.append(r)
+    return sync(shards_dir, base, final, regions, today)
+
+def refresh(shards_dir, path, regions, today=None):
+    """absorb() path's edits, then rewrite path (and the last-merge copy) as the merged shards."""
+    counts = absorb(shards_dir, path, regions, today)
+    write_records(path, merged(shards_dir, today))
+    shutil.copyfile(path, os.path.join(shards_dir, MERGED_FILE))
+    return counts
+
+def _regions(args):
+    return Regions(args.venues, args.colors)
+
+def cmd_init(args):
+    if shard_paths(args.shards):
+        eprint("{} already has shards; use add to insert more.".format(args.shards)); return 1
+    if not os.path.isdir(args.shards):
+        os.makedirs(args.shards)
+    counts = insert(args.shards, list(read_records(args.source)), _regions(args))
+    for name in sorted(counts):
+        print("{:10s} {:5d}".format(name, counts[name]))
+    eprint("Sharded {} listing(s) from {}.".format(sum(counts.values()), os.path.basename(args.source)))
+    return 0
+
+def cmd_add(args):
+    if args.file in (None, '-'):
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.file, 'r') as f:
+            lines = f.read().splitlines()
+    from filter_future_only import group_blocks
+    records = [(b[0], b[1] if len(b) > 1 else '') for b in group_blocks(lines)]
+    if not records:
+        return 1
+    counts = insert(args.shards, records, _regions(args))
+    for name in sorted(counts):
+        print("Saved to shards/{}.txt.".format(name))
+    return 0
+
+def cmd_merge(args):
+    if args.out:
+        removed, added = refresh(args.shards, args.out, _regions(args))
+        if removed or added:
+            eprint("Synced {} edit(s) from {} into the shards: {} removed, {} inserted.".format(
+                removed + added, os.path.basename(args.out), removed, added))
+        return 0
+    for l1, l2 in merged(args.shards):
+        sys.stdout.write(l1 + '\n' + l2 + '\n')
+    return 0
+
+def cmd_sync(args):
+    removed, added = sync(args.shards, list(read_records(args.base)),
+                          list(read_records(args.file)), _regions(args))
+    eprint("Shards: {} listing(s) removed, {} inserted.".format(removed, added))
+    return 0
+
+def cmd_stats(args):
+    total = 0
+    for path in shard_paths(args.shards):
+        n = sum(1 for _ in read_records(path))
+        total += n
+        print("{:10s} {:5d}".format(os.path.basename(path)[:-4], n))
+    print("{:10s} {:5d}".format('total', total))
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='shards.py')
+    ap.add_argument('--shards', default=SHARDS_DIR)
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    ap.add_argument('--colors', default=os.path.join(DATA_DIR, 'vencolor.json'))
+    sub = ap.add_subparsers(dest='cmd')
+
+    i = sub.add_parser('init', help='create the shards from an existing list')
+    i.add_argument('--from', dest='source', default=os.path.join(DATA_DIR, 'mylist.txt'))
+    i.set_defaults(func=cmd_init)
+
+    a = sub.add_parser('add', help='insert listings (FILE or stdin) into their shards')
+    a.add_argument('file', nargs='?')
+    a.set_defaults(func=cmd_add)
+
+    m = sub.add_parser('merge', help='k-way merge of the shards, to stdout or --out')
+    m.add_argument('--out', help='sync this file\'s edits since the last merge, then rewrite it atomically')
+    m.set_defaults(func=cmd_merge)
+
+    s = sub.add_parser('sync', help='apply the changes from --base to FILE to the shards')
+    s.add_argument('--base', required=True, help='the list as merged before editing')
+    s.add_argument('file')
+    s.set_defaults(func=cmd_sync)
+
+    st = sub.add_parser('stats', help='listings per shard')
+    st.set_defaults(func=cmd_stats)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -94,9 +94,12 @@ def smarttime(raw):
     else:
         return parse_time_segment(raw, 'pm')
 
-if __name__ == "__main__":
+def main():
     if len(sys.argv) != 2:
         sys.stderr.write("Usage: smarttime.py <time> (e.g. 73 or 11a/1230)\n")
         sys.exit(1)
     print(smarttime(sys.argv[1]))
 
+if __name__ == "__main__":
+    main()
+
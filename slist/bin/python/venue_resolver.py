@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+venue_resolver.py — map free-text venue strings to venues.xml ids.
+
+Every spelling we know for a venue (pn, ln, the name part of ln before
+the first comma, street addresses inside ln, and any <alias> children) is
+normalized with duplicates.normalize_venue and compiled into a single
+Aho-Corasick automaton. Resolving a listing's trailing text is then one
+linear scan; the longest whole-word hit wins. Spellings shared by more
+than one venue are dropped so they can never resolve to the wrong id.
+
+Usage:
+  venue_resolver.py resolve "Bottom of the Hill, 1233 17th St, S.F."
+  venue_resolver.py unresolved --live-cache livelist-YYYYMMDDHHMM.txt
+"""
+
+from __future__ import print_function
+import sys, os, re
+from collections import deque, Counter
+
+from duplicates import eprint, normalize_venue
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+MIN_PATTERN_LEN = 3
+ADDRESS_RE = re.compile(r'^\d+\s+\S+')
+
+def venue_variants(pn, ln, aliases=()):
+    """Normalized spellings for one venue (may contain duplicates)."""
+    out = [normalize_venue(pn), normalize_venue(ln)]
+    parts = [p.strip() for p in (ln or '').split(',')]
+    if parts:
+        out.append(normalize_venue(parts[0]))
+    for p in parts[1:]:
+        if ADDRESS_RE.match(p):
+            out.append(normalize_venue(p))
+    out.extend(normalize_venue(a) for a in aliases)
+    return [v for v in out if v and len(v) >= MIN_PATTERN_LEN]
+
+class Automaton(object):
+    """Aho-Corasick automaton over normalized strings."""
+
+    def __init__(self, patterns):
+        # patterns: iterable of (text, value)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for text, value in patterns:
+            node = 0
+            for ch in text:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({}); self.fail.append(0); self.out.append([])
+                node = nxt
+            self.out[node].append((len(text), value))
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                cand = self.goto[f].get(ch, 0)
+                self.fail[nxt] = cand if cand != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, value) for every pattern occurrence."""
+        node = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, value in out[node]:
+                yield i + 1 - length, i + 1, value
+
+def _is_word_edge(text, pos):
+    return pos <= 0 or pos >= len(text) or not text[pos].isalnum() or not text[pos - 1].isalnum()
+
+class VenueResolver(object):
+    """Resolve free text to a venue id (int) using one automaton scan."""
+
+    def __init__(self, venues):
+        # venues: iterable of dicts with id, pn, ln, aliases, multiple, color
+        self.venues = {}
+        owners = {}
+        for v in venues:
+            self.venues[v['id']] = v
+            for variant in set(venue_variants(v['pn'], v['ln'], v.get('aliases', ()))):
+                owners.setdefault(variant, set()).add(v['id'])
+        patterns = [(text, next(iter(ids))) for text, ids in owners.items() if len(ids) == 1]
+        self.ambiguous = sorted(text for text, ids in owners.items() if len(ids) > 1)
+        self.automaton = Automaton(patterns)
+
+    def resolve_norm(self, norm):
+        """Resolve an already-normalized string; None if nothing matches."""
+        if not norm:
+            return None
+        best = None
+        for start, end, vid in self.automaton.iter_matches(norm):
+            if not (_is_word_edge(norm, start) and _is_word_edge(norm, end)):
+                continue
+            if best is None or (end - start, -start) > (best[1] - best[0], -best[0]):
+                best = (start, end, vid)
+        return best[2] if best else None
+
+    def resolve(self, text):
+        return self.resolve_norm(normalize_venue(text))
+
+def load_venues(path):
+    """Read venues.xml into a list of plain dicts."""
+    import xml.etree.ElementTree as ET
+    out = []
+    for v in ET.parse(path).getroot().findall('venue'):
+        try:
+            vid = int(v.get('id'))
+        except (TypeError, ValueError):
+            continue
+        out.append({
+            'id': vid,
+            'pn': (v.findtext('pn') or v.get('pn') or '').strip(),
+            'ln': (v.findtext('ln') or v.get('ln') or '').strip(),
+            'aliases': [(a.text or '').strip() for a in v.findall('alias') if (a.text or '').strip()],
+            'color': (v.findtext('color') or v.get('color') or '').strip(),
+            'multiple': (v.findtext('multiple') or '').strip().lower() in ('true', '1', 'yes', 'y'),
+        })
+    return out
+
+def load_resolver(path):
+    """VenueResolver for venues.xml, or None if it is missing/unreadable."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return VenueResolver(load_venues(path))
+    except Exception as ex:
+        eprint("Warning: could not build venue resolver: " + str(ex))
+        return None
+
+def cmd_resolve(args):
+    resolver = load_resolver(args.venues)
+    if resolver is None:
+        eprint("venues.xml not found at {}".format(args.venues)); return 2
+    vid = resolver.resolve(args.text)
+    if vid is None:
+        print("unresolved")
+        return 1
+    v = resolver.venues[vid]
+    print("{}: {} ({})".format(vid, v['pn'], v['ln']))
+    return 0
+
+def cmd_unresolved(args):
+    from duplicates import parse_plain_list
+    resolver = load_resolver(args.venues)
+    if resolver is None:
+        eprint("venues.xml not found at {}".format(args.venues)); return 2
+    with open(args.live_cache, 'r') as f:
+        entries = parse_plain_list(f.read(), resolver)
+    misses = Counter(e['venue_norm'] for e in entries if e.get('venue_id') is None)
+    for norm, n in misses.most_common(args.top):
+        print("{:5d}  {}".format(n, norm))
+    eprint("{} of {} listings unresolved; add <alias> entries to venues.xml for the ones you know."
+           .format(sum(misses.values()), len(entries)))
+    return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='venue_resolver.py')
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    sub = ap.add_subparsers(dest='cmd')
+
+    r = sub.add_parser('resolve', help='resolve one venue string to an id')
+    r.add_argument('text')
+    r.set_defaults(func=cmd_resolve)
+
+    u = sub.add_parser('unresolved', help='list live-list venues with no id (alias candidates)')
+    u.add_argument('--live-cache', required=True)
+    u.add_argument('--top', type=int, default=50)
+    u.set_defaults(func=cmd_unresolved)
+
+    args = ap.parse_args()
+    if not getattr(args, 'cmd', None):
+        ap.print_help(); return 2
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
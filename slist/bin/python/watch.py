@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+watch.py — keep the dupe check current while lists are being edited.
+
+Polls the mtime and size of mylist.txt (or the region shards, see
+shards.py, re-globbed each time), needs_review.txt and the newest
+livelist-*.txt (and venues.xml) every few seconds. When one changes, the
+file is re-split into blocks and only blocks not seen before go through
+parse_block; the rest come from a per-file cache. Live listings sit in a
+(date, venue) index that is patched in place, so a new local listing is
+checked against one bucket and a new live snapshot only touches the
+buckets whose listings changed. Each likely dupe is printed once, when it
+first appears; one that goes away is reported as cleared. Local listings
+are tracked per file, so a listing the write-out moves from
+needs_review.txt to mylist.txt stays one open dupe.
+
+Usage:
+  watch.py                 # poll every 2s until Ctrl-C
+  watch.py --once          # one pass (print the current dupes) and exit
+"""
+
+from __future__ import print_function
+import sys, os, glob, time
+
+from duplicates import (eprint, parse_blocks_from_text, parse_block, likely_dupe,
+                        load_venues_dict, venue_key)
+from live_index import LIVE_BASENAME_PREFIX
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+LOCAL_FILES = ('mylist.txt', 'needs_review.txt')
+
+def file_sig(path):
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+def newest_live(data_dir):
+    paths = glob.glob(os.path.join(data_dir, LIVE_BASENAME_PREFIX + '-*.txt'))
+    return max(paths, key=os.path.getmtime) if paths else None
+
+def local_files(data_dir):
+    """The local lists to poll: needs_review.txt, and the region shards if there
+    are any (new listings land there, mylist.txt is only their merge), else mylist.txt."""
+    paths = [os.path.join(data_dir, name) for name in LOCAL_FILES]
+    shards = sorted(glob.glob(os.path.join(data_dir, 'shards', '*.txt')))
+    return paths[1:] + shards if shards else paths
+
+def one_line(text):
+    return ' / '.join(l.strip() for l in text.splitlines())
+
+class BlockCache(object):
+    """Parsed blocks of one file, keyed by their raw text."""
+
+    def __init__(self, clean=None):
+        self.clean = clean
+        self.blocks = {}   # raw block text -> rec (None if unparseable)
+
+    def refresh(self, path, resolver):
+        """Re-split path; return (added, removed) as {raw: rec} dicts."""
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                text = f.read()
+            if self.clean:
+                text = self.clean(text)
+            raws = ['\n'.join(b).strip() for b in parse_blocks_from_text(text.splitlines())]
+        else:
+            raws = []
+        current = {}
+        added = {}
+        for raw in raws:
+            if not raw or raw in current:
+                continue
+            if raw in self.blocks:
+                current[raw] = self.blocks[raw]
+                continue
+            rec = parse_block(raw.splitlines(), resolver)
+            if not rec or not rec['venue_norm']:
+                rec = None
+            current[raw] = added[raw] = rec
+        removed = dict((raw, rec) for raw, rec in self.blocks.items() if raw not in current)
+        self.blocks = current
+        return (dict((k, v) for k, v in added.items() if v is not None),
+                dict((k, v) for k, v in removed.items() if v is not None))
+
+class DupeWatch(object):
+    """Live and local listings indexed by (date, venue), plus the current hits."""
+
+    def __init__(self, venues_map, out=sys.stdout, known=()):
+        self.venues_map = venues_map
+        self.out = out
+        self.live = {}    # key -> {raw: rec}
+        self.local = {}   # key -> {(source, raw): rec}
+        self.hits = set() # (source, local raw, live raw)
+        self.known = set(known)   # (local raw, live raw) pairs printed by an earlier index
+
+    @staticmethod
+    def key(rec):
+        return (rec['date_key'], venue_key(rec))
+
+    def open_pairs(self):
+        """(local raw, live raw) of every open dupe, whichever files hold the listing."""
+        return set((lraw, vraw) for _, lraw, vraw in self.hits)
+
+    def _check(self, key, local_ids=None, live_raws=None):
+        locals_ = self.local.get(key, {})
+        lives = self.live.get(key, {})
+        for source, lraw in (local_ids if local_ids is not None else list(locals_)):
+            rec = locals_[(source, lraw)]
+            if self.venues_map.get(venue_key(rec), False):
+                continue
+            for vraw in (live_raws if live_raws is not None else list(lives)):
+                if (source, lraw, vraw) in self.hits or not likely_dupe(rec, lives[vraw]):
+                    continue
+                reported = (lraw, vraw) in self.open_pairs() or (lraw, vraw) in self.known
+                self.hits.add((source, lraw, vraw))
+                if not reported:
+                    self.out.write("DUPE  [{}] {}\n      LIVE: {}\n".format(
+                        source, one_line(lraw), one_line(vraw)))
+
+    def _clear(self, pred):
+        gone = [h for h in self.hits if pred(h)]
+        self.hits.difference_update(gone)
+        still = self.open_pairs()
+        for lraw in sorted(set(lraw for _, lraw, vraw in gone if (lraw, vraw) not in still)):
+            self.out.write("clear {}\n".format(one_line(lraw)))
+
+    def local_changed(self, source, added, removed):
+        gone = set(removed)
+        self._clear(lambda h: h[0] == source and h[1] in gone)
+        for raw, rec in removed.items():
+            self.local.get(self.key(rec), {}).pop((source, raw), None)
+        for raw, rec in added.items():
+            self.local.setdefault(self.key(rec), {})[(source, raw)] = rec
+            self._check(self.key(rec), local_ids=[(source, raw)])
+
+    def live_changed(self, added, removed):
+        gone = set(removed)
+        self._clear(lambda h: h[2] in gone)
+        for raw, rec in removed.items():
+            self.live.get(self.key(rec), {}).pop(raw, None)
+        touched = {}
+        for raw, rec in added.items():
+            self.live.setdefault(self.key(rec), {})[raw] = rec
+            touched.setdefault(self.key(rec), []).append(raw)
+        for key, raws in touched.items():
+            self._check(key, live_raws=raws)
+
+def watch(args):
+    from live_stream import clean_live_text
+    from venue_resolver import load_resolver
+
+    venues_sig = file_sig(args.venues)
+    resolver = load_resolver(args.venues)
+    dw = DupeWatch(load_venues_dict(args.venues) if venues_sig else {})
+    caches = {}   # local path -> BlockCache
+    live_cache = BlockCache(clean_live_text)
+    sigs = {}
+    live_path = None
+    rebuilt = None
+
+    while True:
+        sig = file_sig(args.venues)
+        if sig != venues_sig:
+            # ids / <multiple> flags may have changed: rebuild everything
+            eprint("venues.xml changed; re-indexing.")
+            venues_sig = sig
+            resolver = load_resolver(args.venues)
+            rebuilt = dw.open_pairs()
+            dw = DupeWatch(load_venues_dict(args.venues) if sig else {}, known=rebuilt)
+            live_path = None
+            caches = {}
+            live_cache = BlockCache(clean_live_text)
+            sigs = {}
+        newest = newest_live(args.data_dir)
+        if newest != live_path or file_sig(newest) != sigs.get(newest):
+            live_path = newest
+            sigs[newest] = file_sig(newest)
+            added, removed = live_cache.refresh(newest, resolver)
+            dw.live_changed(added, removed)
+            if added or removed:
+                eprint("{}: +{} / -{} live listings".format(
+                    os.path.basename(newest or '(none)'), len(added), len(removed)))
+        # re-globbed every poll, like newest_live: shards can appear while watching
+        local_paths = local_files(args.data_dir)
+        for path in local_paths:
+            sig = file_sig(path)
+            if path in sigs and sig == sigs[path]:
+                continue
+            sigs[path] = sig
+            added, removed = caches.setdefault(path, BlockCache()).refresh(path, resolver)
+            dw.local_changed(os.path.basename(path), added, removed)
+        for path in [p for p in caches if p not in local_paths]:
+            # no longer polled (e.g. mylist.txt once shards exist): its listings go,
+            # after the new files are in, so a listing that moved stays one open dupe
+            sigs.pop(path, None)
+            added, removed = caches.pop(path).refresh(None, resolver)
+            dw.local_changed(os.path.basename(path), added, removed)
+        if rebuilt is not None:
+            for lraw in sorted(set(lraw for lraw, _ in rebuilt - dw.open_pairs())):
+                dw.out.write("clear {}\n".format(one_line(lraw)))
+            dw.known = set()
+            rebuilt = None
+        sys.stdout.flush()
+        if args.once:
+            return 1 if dw.hits else 0
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            eprint("\n{} likely dupe(s) open.".format(len(dw.open_pairs())))
+            return 0
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(prog='watch.py')
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    ap.add_argument('--venues', default=os.path.join(DATA_DIR, 'venues.xml'))
+    ap.add_argument('--interval', type=float, default=2.0, help='seconds between polls')
+    ap.add_argument('--once', action='store_true', help='single pass; exit 1 if there are dupes')
+    args = ap.parse_args()
+    try:
+        return watch(args)
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,7 +3,6 @@ import os
 import sys
 import shutil
 import subprocess
-import readline
 from datetime import datetime
 
 # Paths (adjust relative to this script)
@@ -11,11 +10,13 @@ BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data
 NEEDS = os.path.join(BASE, 'needs_review.txt')
 MAIN  = os.path.join(BASE, 'mylist.txt')
 F_FLAG = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'flags', 'f.sh'))
+JOURNAL = os.path.join(BASE, 'review_journal.jsonl')
 
-# Ensure data directory and files exist
-os.makedirs(BASE, exist_ok=True)
-open(NEEDS, 'a').close()
-open(MAIN, 'a').close()
+def ensure_data_files():
+    """Ensure data directory and files exist."""
+    os.makedirs(BASE, exist_ok=True)
+    open(NEEDS, 'a').close()
+    open(MAIN, 'a').close()
 
 def read_records(path):
     """Yield (line1, line2) for each two-line record, skipping blanks."""
@@ -37,6 +38,7 @@ def prompt_record(line1, line2):
 
 def prompt_edit(prompt, default):
     # Pre-fill input using readline
+    import readline
     def hook():
         readline.insert_text(default)
         readline.redisplay()
@@ -49,23 +51,44 @@ def prompt_edit(prompt, default):
 
 
 def main():
-    # 1) Process entries
+    ensure_data_files()
+    from review_journal import Journal, block_key
+    journal = Journal(JOURNAL)
+    # Records already in mylist (e.g. written before an interrupted run)
+    written = set(read_records(MAIN))
+
+    # 1) Process entries; each decision is journaled as soon as it is made
     for line1, line2 in read_records(NEEDS):
-        choice = prompt_record(line1, line2)
+        key = block_key([line1, line2])
+        past = journal.get('review', key)
+        if past is not None:
+            choice = past['choice']
+            if choice == 'e' and past.get('text'):
+                line1, _, line2 = past['text'].partition('\n')
+            print('→ Replaying earlier decision ({}) for: {}'.format(choice or 'keep', line1))
+        else:
+            choice = prompt_record(line1, line2)
+            if choice == 'e':
+                line1 = prompt_edit('Edit line1: ', line1)
+                line2 = prompt_edit('Edit line2: ', line2)
+            journal.record('review', key, choice,
+                           text=line1 + '\n' + line2 if choice == 'e' else None)
         if choice == 'd':
             print('→ Deleted.')
             continue
         if choice == 'e':
-            line1 = prompt_edit('Edit line1: ', line1)
-            line2 = prompt_edit('Edit line2: ', line2)
             print('→ Edited, saving.')
         else:
             print('→ Accepted.')
+        if (line1, line2) in written:
+            continue
         with open(MAIN, 'a') as m:
             m.write(line1 + '\n' + line2 + '\n\n')
+        written.add((line1, line2))
 
-    # 2) Clear needs_review.txt
+    # 2) Clear needs_review.txt; its decisions were only kept for a resume
     open(NEEDS, 'w').close()
+    journal.clear('review')
     print('Cleared needs_review.txt')
 
     # 3) Sort main list
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Shared bits for the slist tests: bin/python on sys.path and listing builders."""
+
+import os, sys, datetime as dt
+
+BIN_PYTHON = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'bin', 'python'))
+if BIN_PYTHON not in sys.path:
+    sys.path.insert(0, BIN_PYTHON)
+
+def header(days, text=''):
+    """Date header for today + days in the list's spelling ('oct 22 thr'), plus text."""
+    d = dt.date.today() + dt.timedelta(days=days)
+    head = '{} {} {}'.format(d.strftime('%b').lower(), d.day,
+                             d.strftime('%a').lower().replace('thu', 'thr'))
+    return head + ' ' + text if text else head
+
+def rec(days, text, venue):
+    """A two-line (l1, l2) listing today + days at venue."""
+    return (header(days, text), '       at ' + venue)
+
+def write_list(path, records):
+    with open(path, 'w') as f:
+        for l1, l2 in records:
+            f.write(l1 + '\n' + l2 + '\n')
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Dupe clusters and the auto-resolution rules in duplicates.py."""
+
+import unittest
+
+import support
+from duplicates import dupe_score, auto_resolve, parse_block, DEFAULT_RULES
+from live_index import LiveIndex
+from support import rec
+
+def entry(text, bands, time_min, date_key='2026-10-22', venue_id=13):
+    return {'date_key': date_key, 'venue_norm': 'el rio', 'venue_id': venue_id,
+            'time_min': time_min, 'bands': bands, 'full_text': text + '\n       at El Rio'}
+
+def cluster(e, candidates):
+    scores = [dupe_score(e, x) for x in candidates]
+    return {'entry': e, 'candidates': candidates, 'scores': scores, 'score': max(scores)}
+
+class DupeRulesTest(unittest.TestCase):
+
+    def test_same_text_is_reviewed_by_default(self):
+        a = entry('oct 22 thr foo, bar $10 8pm', ['foo', 'bar'], 1200)
+        c = cluster(a, [dict(a)])
+        self.assertEqual(c['score'], 1.0)
+        self.assertIsNone(auto_resolve(c, False, DEFAULT_RULES))
+
+    def test_auto_omit_score_is_opt_in(self):
+        a = entry('oct 22 thr foo, bar $10 8pm', ['foo', 'bar'], 1200)
+        rules = dict(DEFAULT_RULES, auto_omit_score=0.9)
+        self.assertEqual(auto_resolve(cluster(a, [dict(a)]), False, rules)[0], 'y')
+
+    def test_partial_match_is_left_to_the_user(self):
+        a = entry('oct 22 thr foo, bar $10 8pm', ['foo', 'bar'], 1200)
+        b = entry('oct 22 thr foo, qux $10 9:30pm', ['foo', 'qux'], 1290)
+        self.assertIsNone(auto_resolve(cluster(a, [b]), False, DEFAULT_RULES))
+
+    def test_multiple_venue_disjoint_lineup_kept(self):
+        a = entry('oct 22 thr foo $10 8pm', ['foo'], 1200)
+        b = entry('oct 22 thr qux $10 8pm', ['qux'], 1200)
+        self.assertEqual(auto_resolve(cluster(a, [b]), True, DEFAULT_RULES)[0], 'n')
+
+    def test_auto_keep_score(self):
+        a = entry('oct 22 thr foo $10 8pm', ['foo'], 1200)
+        b = entry('oct 22 thr qux $10 11pm', ['qux'], 1380)
+        rules = dict(DEFAULT_RULES, auto_keep_score=0.5)
+        self.assertEqual(auto_resolve(cluster(a, [b]), False, rules)[0], 'n')
+
+class LiveIndexRulesTest(unittest.TestCase):
+    """g.sh's live index flags what the write-out would ask about."""
+
+    LIVE = [rec(3, 'foo, bar $10 8pm', 'El Rio'), rec(3, 'qux $5 8pm', 'El Rio')]
+
+    def index(self, multiple, rules=None):
+        live = [parse_block(list(r)) for r in self.LIVE]
+        return LiveIndex(live, {('norm', 'el rio'): multiple}, rules=rules)
+
+    def test_multiple_venue_shared_band_flagged(self):
+        hits = self.index(True).matches('\n'.join(rec(3, 'foo, zed $10 8pm', 'El Rio')))
+        self.assertEqual([h['full_text'] for h in hits], ['\n'.join(r) for r in self.LIVE])
+
+    def test_multiple_venue_disjoint_lineup_not_flagged(self):
+        self.assertEqual(self.index(True).matches('\n'.join(rec(3, 'zed, quux $10 8pm', 'El Rio'))), [])
+
+    def test_multiple_venues_keep_rule(self):
+        index = self.index(True, dict(DEFAULT_RULES, multiple_venues='keep'))
+        self.assertEqual(index.matches('\n'.join(rec(3, 'foo, zed $10 8pm', 'El Rio'))), [])
+
+    def test_single_show_venue_always_flagged(self):
+        hits = self.index(False).matches('\n'.join(rec(3, 'zed, quux $10 8pm', 'El Rio')))
+        self.assertEqual(len(hits), 2)
+
+if __name__ == '__main__':
+    unittest.main()
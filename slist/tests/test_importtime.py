@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Every slist command module imports within IMPORT_BUDGET_MS (see __main__.importtime)."""
+
+import os, sys, unittest
+
+import support
+
+HERE = support.BIN_PYTHON
+
+def load_cli():
+    """bin/python/__main__.py under another name, so it does not replace this __main__."""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('slist_cli', os.path.join(HERE, '__main__.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class ImportTimeTest(unittest.TestCase):
+
+    def test_command_modules_within_budget(self):
+        cli = load_cli()
+        for name in sorted(cli.COMMANDS):
+            module = cli.COMMANDS[name][0]
+            with self.subTest(module=module):
+                # best of three: one slow start on a busy machine is not a regression
+                ms = min(cli.module_import_ms(module, HERE) for _ in range(3))
+                self.assertLessEqual(ms, cli.IMPORT_BUDGET_MS,
+                                     '{} imports in {:.1f} ms'.format(module, ms))
+
+    def test_listing_table_does_not_import_numpy(self):
+        import subprocess
+        proc = subprocess.run(
+            [sys.executable, '-c', 'import sys, listing_table; print("numpy" in sys.modules)'],
+            env=dict(os.environ, PYTHONPATH=HERE), stdout=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(proc.stdout.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
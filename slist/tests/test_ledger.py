@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Ledger.partition: new / changed / already submitted."""
+
+import os, shutil, tempfile, unittest
+import datetime as dt
+
+import support
+from duplicates import parse_mylist
+from ledger import Ledger
+from support import header
+
+def entries(*blocks):
+    return parse_mylist(''.join(l1 + '\n' + l2 + '\n' for l1, l2 in blocks))
+
+SENT = (header(3) + ' foo, bar $10 8pm', '       at El Rio')
+RESPELLED = (header(3) + ' foo, bar, baz $10 8pm', '       at El Rio')   # same slot, new text
+OTHER = (header(4) + ' qux $5 9pm', '       at El Rio')
+
+class LedgerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'submitted.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_empty_ledger_everything_new(self):
+        new, changed, submitted = Ledger(self.path).partition(entries(SENT, OTHER))
+        self.assertEqual((len(new), len(changed), len(submitted)), (2, 0, 0))
+
+    def test_partition_after_record(self):
+        ledger = Ledger(self.path)
+        self.assertEqual(ledger.record(entries(SENT)), 1)
+        ledger.save()
+        new, changed, submitted = Ledger(self.path).partition(entries(SENT, RESPELLED, OTHER))
+        self.assertEqual([e['full_text'] for e in submitted], ['\n'.join(SENT)])
+        self.assertEqual([e['full_text'] for e in changed], ['\n'.join(RESPELLED)])
+        self.assertEqual([e['full_text'] for e in new], ['\n'.join(OTHER)])
+
+    def test_forget_resends(self):
+        ledger = Ledger(self.path)
+        ledger.record(entries(SENT))
+        self.assertEqual(ledger.forget(entries(SENT)), 1)
+        new, changed, submitted = ledger.partition(entries(SENT))
+        self.assertEqual((len(new), len(changed), len(submitted)), (1, 0, 0))
+
+    def test_save_drops_past_shows(self):
+        ledger = Ledger(self.path)
+        ledger.record(entries(SENT))
+        ledger.save(today=dt.date.today() + dt.timedelta(days=10))
+        self.assertEqual(Ledger(self.path).listings, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""live_stream's extractor must not care where the download splits its chunks."""
+
+import os, shutil, tempfile, threading, unittest
+
+import support
+from live_stream import iter_blocks, iter_url_blocks, clean_live_text
+
+PAGE = (u'<html><head><title>The List</title><script>var x = "<br>oct 1 wed";</script></head>\n'
+        u'<body><pre>\n'
+        u'oct 22 thr Foo &amp; Bar, Café Tacuba a/a $10 8pm<br>\n'
+        u'       at El Rio\n'
+        u'oct 23 fri Ni&ntilde;o &#x26; the &quot;Quotes&quot; $5 9pm\n'
+        u'       at Eli&#39;s Mile High Club, Oakland\n'
+        u'</pre></body></html>\n')
+
+EXPECTED = [
+    [u'oct 22 thr Foo & Bar, Café Tacuba a/a $10 8pm', u'       at El Rio'],
+    [u'oct 23 fri Niño & the "Quotes" $5 9pm', u"       at Eli's Mile High Club, Oakland"],
+]
+
+def one_byte_chunks(data):
+    return [data[i:i + 1] for i in range(len(data))]
+
+class ExtractorTest(unittest.TestCase):
+
+    def test_whole_page(self):
+        self.assertEqual(list(iter_blocks([PAGE.encode('utf-8')])), EXPECTED)
+
+    def test_one_byte_chunks(self):
+        # splits every entity and every multi-byte UTF-8 character
+        self.assertEqual(list(iter_blocks(one_byte_chunks(PAGE.encode('utf-8')))), EXPECTED)
+
+    def test_entity_split_across_str_chunks(self):
+        text = PAGE.replace(u'&amp;', u'&am\x00p;')
+        chunks = text.split(u'\x00')
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(list(iter_blocks(chunks)), EXPECTED)
+
+    def test_no_markup_leaks_into_last_block(self):
+        last = list(iter_blocks(one_byte_chunks(PAGE.encode('utf-8'))))[-1]
+        self.assertFalse(any('<' in line or '&' in line.replace(' & ', '') for line in last))
+
+    def test_clean_live_text_leaves_plain_text_alone(self):
+        plain = u'oct 22 thr a & b $5\n       at El Rio\n'
+        self.assertEqual(clean_live_text(plain), plain)
+
+class FixtureServer(object):
+    """PAGE served from localhost, written out in small pieces."""
+
+    def __init__(self, body, piece=7):
+        from http.server import HTTPServer, BaseHTTPRequestHandler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                for i in range(0, len(body), piece):
+                    self.wfile.write(body[i:i + piece])
+                    self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{}/list'.format(self.httpd.server_address[1])
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class UrlStreamTest(unittest.TestCase):
+
+    def test_iter_url_blocks(self):
+        with FixtureServer(PAGE.encode('utf-8')) as server:
+            self.assertEqual(list(iter_url_blocks(server.url, chunk_size=3)), EXPECTED)
+
+    def test_stream_live_list_parses_and_caches(self):
+        from live_index import stream_live_list
+        tmp = tempfile.mkdtemp()
+        try:
+            with FixtureServer(PAGE.encode('utf-8')) as server:
+                entries = stream_live_list(server.url, tmp)
+            self.assertEqual([e['full_text'] for e in entries], ['\n'.join(b) for b in EXPECTED])
+            cached = [n for n in os.listdir(tmp) if n.startswith('livelist-')]
+            self.assertEqual(len(cached), 1)
+            with open(os.path.join(tmp, cached[0]), 'r') as f:
+                self.assertEqual(f.read(), ''.join('\n'.join(b) + '\n' for b in EXPECTED))
+        finally:
+            shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""runner.stage_wo end to end on a temp data dir, with the dupe check stubbed."""
+
+import os, shutil, tempfile, unittest
+try:
+    from unittest import mock
+except ImportError:
+    mock = None
+
+import support
+import duplicates, runner
+
+VENUES_XML = '''<?xml version="1.0" encoding="utf-8"?>
+<venues>
+  <venue id="1"><pn>El Rio</pn><ln>El Rio, S.F.</ln><color>green</color></venue>
+</venues>
+'''
+
+class StageWoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = tempfile.mkdtemp()
+        with open(os.path.join(self.data, 'venues.xml'), 'w') as f:
+            f.write(VENUES_XML)
+        self.live = os.path.join(self.data, 'livelist-20260101.txt')
+        support.write_list(self.live, [support.rec(3, 'someone else $5 9pm', 'El Rio')])
+        self.mylist = os.path.join(self.data, 'mylist.txt')
+        open(os.path.join(self.data, 'needs_review.txt'), 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.data)
+
+    def run_wo(self, checked):
+        session = runner.Session(self.data)
+        with open(self.live, 'r') as f:
+            session._cache['live'] = {'path': self.live, 'text': f.read(), 'entries': []}
+        with mock.patch.object(duplicates, 'interactive_filter', return_value=checked), \
+                mock.patch.object(runner, 'page'), mock.patch('sys.stdout'):
+            runner.stage_wo(session, [])
+            session.flush()
+        return list(runner.read_records(self.mylist))
+
+    @unittest.skipIf(mock is None, 'needs unittest.mock')
+    def test_one_line_edit_is_written_as_two_lines(self):
+        listing = support.rec(3, 'foo, bar $10 8pm', 'El Rio')
+        later = support.rec(5, 'baz $5 9pm', 'El Rio')
+        support.write_list(self.mylist, [listing, later])
+        edited = support.header(3, 'foo, bar, qux $10 8pm') + ' at El Rio'
+        self.assertEqual(self.run_wo([edited, '\n'.join(later)]), [
+            (support.header(3, 'foo, bar, qux $10 8pm'), runner.INDENT + 'at El Rio'),
+            later,
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Region shards: the k-way merge, and merge --out keeping edits made to mylist.txt."""
+
+import os, shutil, tempfile, unittest
+
+import support
+import shards
+from support import rec, write_list
+
+VENUES_XML = '''<?xml version="1.0" encoding="utf-8"?>
+<venues>
+  <venue id="1"><pn>El Rio</pn><ln>El Rio, S.F.</ln><color>green</color></venue>
+  <venue id="2" pn="Eli's" ln="Eli's Mile High Club, Oakland" color="blue"/>
+</venues>
+'''
+
+class ShardsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.dir = os.path.join(self.tmp, 'shards')
+        os.mkdir(self.dir)
+        venues = os.path.join(self.tmp, 'venues.xml')
+        with open(venues, 'w') as f:
+            f.write(VENUES_XML)
+        self.regions = shards.Regions(venues, None)
+        self.mylist = os.path.join(self.tmp, 'mylist.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def read(self, path):
+        return list(shards.read_records(path))
+
+    def test_insert_routes_by_color_and_merge_sorts(self):
+        late = rec(3, 'late $5 10pm', 'El Rio')
+        early = rec(3, 'early $5 7pm', "Eli's Mile High Club, Oakland")
+        first = rec(1, 'first $5 9pm', 'El Rio')
+        counts = shards.insert(self.dir, [late, early, first], self.regions)
+        self.assertEqual(counts, {'green': 2, 'blue': 1})
+        self.assertEqual(list(shards.merged(self.dir)), [first, early, late])
+
+    def test_refresh_keeps_direct_edits(self):
+        a, b = rec(1, 'a $5 8pm', 'El Rio'), rec(2, 'b $5 8pm', 'El Rio')
+        shards.insert(self.dir, [a, b], self.regions)
+        shards.refresh(self.dir, self.mylist, self.regions)
+        self.assertEqual(self.read(self.mylist), [a, b])
+
+        # a fallback save appended to mylist.txt, and a hand edit dropping b
+        added = rec(3, 'appended $5 8pm', "Eli's Mile High Club, Oakland")
+        write_list(self.mylist, [a, added])
+        # meanwhile another editor adds c straight to the shards
+        c = rec(4, 'c $5 8pm', 'El Rio')
+        shards.insert(self.dir, [c], self.regions)
+
+        self.assertEqual(shards.refresh(self.dir, self.mylist, self.regions), (1, 1))
+        self.assertEqual(self.read(self.mylist), [a, added, c])
+        self.assertEqual(list(shards.merged(self.dir)), [a, added, c])
+
+    def test_first_refresh_only_adds(self):
+        a = rec(1, 'a $5 8pm', 'El Rio')
+        shards.insert(self.dir, [a], self.regions)
+        stray = rec(2, 'stray $5 8pm', 'El Rio')
+        write_list(self.mylist, [stray])
+        self.assertEqual(shards.refresh(self.dir, self.mylist, self.regions), (0, 1))
+        self.assertEqual(self.read(self.mylist), [a, stray])
+
+    def test_sync_counts_duplicate_copies(self):
+        a, b = rec(1, 'a $5 8pm', 'El Rio'), rec(2, 'b $5 8pm', 'El Rio')
+        shards.insert(self.dir, [a, a, b], self.regions)
+        # one of two copies dropped: only that one goes
+        self.assertEqual(shards.sync(self.dir, [a, a, b], [a, b], self.regions), (1, 0))
+        self.assertEqual(list(shards.merged(self.dir)), [a, b])
+        # a second copy added back is inserted, not collapsed into the first
+        self.assertEqual(shards.sync(self.dir, [a, b], [a, a, b], self.regions), (0, 1))
+        self.assertEqual(list(shards.merged(self.dir)), [a, a, b])
+
+    def test_refresh_keeps_a_copy_added_to_mylist(self):
+        a = rec(1, 'a $5 8pm', 'El Rio')
+        shards.insert(self.dir, [a], self.regions)
+        shards.refresh(self.dir, self.mylist, self.regions)
+        write_list(self.mylist, [a, a])
+        self.assertEqual(shards.refresh(self.dir, self.mylist, self.regions), (0, 1))
+        self.assertEqual(self.read(self.mylist), [a, a])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""VenueResolver on venue strings the way the live list spells them."""
+
+import unittest
+
+import support
+from venue_resolver import VenueResolver
+
+VENUES = [
+    {'id': 7, 'pn': 'Bottom Of The Hill', 'ln': 'Bottom Of The Hill, 1233 17th St., S.F.',
+     'aliases': [], 'color': 'green', 'multiple': False},
+    {'id': 13, 'pn': 'El Rio', 'ln': 'El Rio, S.F.', 'aliases': [], 'color': 'green', 'multiple': False},
+    {'id': 14, 'pn': "Eli's", 'ln': "Eli's Mile High Club, Oakland", 'aliases': ['Elis'],
+     'color': 'blue', 'multiple': False},
+    {'id': 20, 'pn': 'The Chapel', 'ln': 'The Chapel, S.F.', 'aliases': [], 'color': 'green', 'multiple': True},
+    {'id': 21, 'pn': 'The Chapel', 'ln': 'The Chapel, Berkeley', 'aliases': [], 'color': 'blue', 'multiple': False},
+]
+
+class ResolverTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.resolver = VenueResolver(VENUES)
+
+    def test_live_list_venue_lines(self):
+        cases = [
+            ('       at El Rio', 13),
+            ('at El Rio, S.F.', 13),
+            ("at Eli's Mile High Club, Oakland", 14),
+            ('at Bottom of the Hill, S.F. a/a $15 8pm/9pm', 7),
+            ('at 1233 17th st., s.f.', 7),
+        ]
+        for text, vid in cases:
+            self.assertEqual(self.resolver.resolve(text), vid, text)
+
+    def test_alias(self):
+        self.assertEqual(self.resolver.resolve('at Elis, Oakland'), 14)
+
+    def test_whole_words_only(self):
+        self.assertIsNone(self.resolver.resolve('at the Elrioville Lounge'))
+
+    def test_unknown_venue(self):
+        self.assertIsNone(self.resolver.resolve('at Some Backyard, Fremont'))
+        self.assertIsNone(self.resolver.resolve(''))
+
+    def test_shared_spelling_is_ambiguous(self):
+        self.assertIn('chapel', self.resolver.ambiguous)
+        self.assertIsNone(self.resolver.resolve('at The Chapel'))
+        self.assertEqual(self.resolver.resolve('at The Chapel, Berkeley'), 21)
+
+if __name__ == '__main__':
+    unittest.main()
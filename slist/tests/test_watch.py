@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""watch.DupeWatch: dupes tracked per local file; the files it polls."""
+
+import io, os, shutil, tempfile, unittest
+
+import support
+from duplicates import parse_block
+from watch import DupeWatch, local_files
+
+def parsed(*records):
+    out = {}
+    for l1, l2 in records:
+        out[l1 + '\n' + l2] = parse_block([l1, l2])
+    return out
+
+class DupeWatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.out = io.StringIO()
+        self.dw = DupeWatch({}, out=self.out)
+        self.mine = parsed(support.rec(3, 'foo, bar $10 8pm', 'El Rio'))
+        self.dw.live_changed(parsed(support.rec(3, 'foo, bar $10 8pm', 'El Rio')), {})
+
+    def test_move_between_files_keeps_the_dupe_open(self):
+        self.dw.local_changed('needs_review.txt', self.mine, {})
+        self.assertEqual(self.out.getvalue().count('DUPE'), 1)
+        # the write-out: mylist.txt gains the listing, then needs_review.txt loses it
+        self.dw.local_changed('mylist.txt', self.mine, {})
+        self.dw.local_changed('needs_review.txt', {}, self.mine)
+        self.assertEqual(len(self.dw.open_pairs()), 1)
+        self.assertEqual(self.out.getvalue().count('DUPE'), 1)
+        self.assertNotIn('clear', self.out.getvalue())
+
+    def test_cleared_when_no_file_holds_it(self):
+        self.dw.local_changed('mylist.txt', self.mine, {})
+        self.dw.local_changed('mylist.txt', {}, self.mine)
+        self.assertEqual(self.dw.open_pairs(), set())
+        self.assertEqual(self.out.getvalue().count('clear'), 1)
+
+class LocalFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_shards_replace_mylist_once_they_exist(self):
+        names = lambda: [os.path.relpath(p, self.tmp) for p in local_files(self.tmp)]
+        self.assertEqual(names(), ['mylist.txt', 'needs_review.txt'])
+        os.mkdir(os.path.join(self.tmp, 'shards'))
+        for name in ('green.txt', 'blue.txt'):
+            support.write_list(os.path.join(self.tmp, 'shards', name), [])
+        self.assertEqual(names(), ['needs_review.txt', 'shards/blue.txt', 'shards/green.txt'])
+
+if __name__ == '__main__':
+    unittest.main()